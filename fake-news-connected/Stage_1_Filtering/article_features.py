@@ -0,0 +1,51 @@
+class ArticleFeatures:
+    """Derived features of one article, each computed on first use and then kept.
+
+    The pipeline builds one per article and hands it to the authenticity filter
+    and the preprocessor, so the content is split once, the title's capitals
+    are counted once and the text is cleaned and tokenized once. Cleaning and
+    tokenizing use the NewsPreprocessor given as preprocessor.
+    """
+
+    __slots__ = ('content', 'title', 'preprocessor', '_word_count', '_caps_ratio', '_content_clean', '_tokens')
+
+    def __init__(self, content, title="", preprocessor=None):
+        self.content = content
+        self.title = title
+        self.preprocessor = preprocessor
+        self._word_count = None
+        self._caps_ratio = None
+        self._content_clean = None
+        self._tokens = None
+
+    @classmethod
+    def of(cls, article_data, preprocessor=None):
+        return cls(article_data.get('content', ''), article_data.get('title', ''), preprocessor)
+
+    @property
+    def word_count(self):
+        """Whitespace-separated words of the raw content."""
+        if self._word_count is None:
+            self._word_count = len(self.content.split())
+        return self._word_count
+
+    @property
+    def caps_ratio(self):
+        """Share of upper-case characters in the title, 0.0 without a title."""
+        if self._caps_ratio is None:
+            title = self.title
+            self._caps_ratio = sum(map(str.isupper, title)) / len(title) if title else 0.0
+        return self._caps_ratio
+
+    @property
+    def content_clean(self):
+        if self._content_clean is None:
+            self._content_clean = self.preprocessor.clean_text(self.content)
+        return self._content_clean
+
+    @property
+    def tokens(self):
+        """Filtered tokens of the cleaned content (NewsPreprocessor.tokenize_clean)."""
+        if self._tokens is None:
+            self._tokens = self.preprocessor.tokenize_clean(self.content_clean)
+        return self._tokens
@@ -0,0 +1,109 @@
+from collections.abc import MutableMapping
+
+# Fields the pipeline stages set, in the order they usually appear
+FIELDS = (
+    'url', 'domain', 'title', 'content', 'final_url', 'redirect_chain', 'collection_timestamp', 'source_type',
+    'domain_check', 'domain_score', 'domain_status', 'domain_reason', 'domain_reference', 'domain_ratings',
+    'ratings_version', 'source_trust_score', 'source_trust_reason', 'content_trust_score',
+    'overall_authenticity_score', 'filter_decision', 'filter_reason', 'rule_decision', 'rule_reason',
+    'content_clean', 'content_tokens', 'content_stemmed', 'word_count', 'ready_for_stage2', 'cache_hit',
+)
+# Token lists, kept as one space-joined string and split again when read
+PACKED = ('content_tokens', 'content_stemmed')
+
+_SLOTS = {field: '_' + field if field in PACKED else field for field in FIELDS}
+
+
+def _pack(tokens):
+    packed = ' '.join(tokens)
+    # Tokens that are empty or contain a space would not split back the same
+    if packed.count(' ') == len(tokens) - 1 and all(tokens):
+        return packed
+    return list(tokens)
+
+
+def _unpack(packed):
+    if isinstance(packed, list):
+        return list(packed)
+    return packed.split(' ')
+
+
+class ArticleRecord(MutableMapping):
+    """One article on its way through Stage1Pipeline, readable and writable like a dict.
+
+    The known FIELDS live in slots instead of a per-article dict, and the
+    collector's record is updated in place by every stage rather than copied.
+    content_tokens and content_stemmed are stored as a single string each,
+    a fraction of the size of a list of separate token strings; reading one
+    returns a new list. Keys outside FIELDS are kept in a small dict.
+    """
+
+    __slots__ = tuple(_SLOTS.values()) + ('_extra',)
+
+    def __init__(self, data=(), **fields):
+        self._extra = None
+        self.update(data, **fields)
+
+    def __getitem__(self, key):
+        slot = _SLOTS.get(key)
+        if slot is None:
+            if self._extra is None:
+                raise KeyError(key)
+            return self._extra[key]
+        try:
+            value = getattr(self, slot)
+        except AttributeError:
+            raise KeyError(key) from None
+        return _unpack(value) if key in PACKED else value
+
+    def __setitem__(self, key, value):
+        slot = _SLOTS.get(key)
+        if slot is None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        else:
+            setattr(self, slot, _pack(value) if key in PACKED else value)
+
+    def __delitem__(self, key):
+        slot = _SLOTS.get(key)
+        if slot is None:
+            if self._extra is None:
+                raise KeyError(key)
+            del self._extra[key]
+            return
+        try:
+            delattr(self, slot)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        slot = _SLOTS.get(key)
+        if slot is None:
+            return self._extra is not None and key in self._extra
+        return hasattr(self, slot)
+
+    def __iter__(self):
+        for field, slot in _SLOTS.items():
+            if hasattr(self, slot):
+                yield field
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self)!r})'
+
+    def copy(self):
+        """Shallow copy that shares the packed token strings."""
+        other = type(self)()
+        for slot in _SLOTS.values():
+            try:
+                setattr(other, slot, getattr(self, slot))
+            except AttributeError:
+                pass
+        if self._extra:
+            other._extra = dict(self._extra)
+        return other
@@ -1,46 +1,51 @@
+import numpy as np
 from domain_quality.domain_quality import DomainQualityDB
+from Stage_1_Filtering.article_features import ArticleFeatures
 
 class AuthenticityFilter:
     def __init__(self):
         self.db = DomainQualityDB()
 
-    def check_source_authenticity(self, article_data):
+    def check_source_authenticity(self, article_data, domain_info=None):
         domain = article_data.get('domain', '').lower()
-        domain_info = self.db.get_domain_info(domain)
+        if domain_info is None:
+            domain_info = self.db.get_domain_info(domain)
 
         score = domain_info['score']
         reason = domain_info['reason']
         status = domain_info['status']
         reference = domain_info['reference']
+        ratings = domain_info.get('ratings')
 
         # Attach trust info to article data for traceability
         article_data['domain_score'] = score
         article_data['domain_status'] = status
         article_data['domain_reason'] = reason
         article_data['domain_reference'] = reference
+        article_data['domain_ratings'] = ratings._asdict() if ratings else None
+        article_data['ratings_version'] = domain_info.get('ratings_version')
 
         return score, reason
 
-    def check_content_authenticity(self, article_data):
-        content = article_data.get('content', '')
-        title = article_data.get('title', '')
+    def check_content_authenticity(self, article_data, features=None):
+        if features is None:
+            features = ArticleFeatures.of(article_data)
         
         score = 0.5  # Base neutral content score
         
-        if title:
-            caps_ratio = sum(1 for c in title if c.isupper()) / len(title)
-            if caps_ratio > 0.5:
-                score = max(0, score - 0.2)
+        if features.caps_ratio > 0.5:
+            score = max(0, score - 0.2)
         
-        word_count = len(content.split())
-        if word_count < 50:
+        if features.word_count < 50:
             score = max(0, score - 0.3)
         
         return score
 
-    def apply_authenticity_filter(self, article_data):
+    def apply_authenticity_filter(self, article_data, features=None):
+        if features is None:
+            features = ArticleFeatures.of(article_data)
         source_score, source_reason = self.check_source_authenticity(article_data)
-        content_score = self.check_content_authenticity(article_data)
+        content_score = self.check_content_authenticity(article_data, features)
         overall_score = (source_score * 0.6) + (content_score * 0.4)
 
         article_data['source_trust_score'] = source_score
@@ -50,7 +55,48 @@ class AuthenticityFilter:
 
         if overall_score < 0.3:
             return 'BLOCK', 'Low authenticity score. Article likely unreliable.'
-        elif len(article_data.get('content', '').split()) < 20:
+        elif features.word_count < 20:
             return 'BLOCK', 'Content too short for reliable analysis.'
         return 'PASS', 'Passed authenticity check.'
-        
\ No newline at end of file
+
+    def apply_authenticity_filter_batch(self, articles, features=None):
+        """Batch form of apply_authenticity_filter, returning one (decision, reason) per article.
+
+        Each distinct domain is looked up once and the content heuristics and
+        score thresholds are evaluated as array operations over the batch.
+        features, if given, holds the ArticleFeatures of each article.
+        """
+        if not articles:
+            return []
+        if features is None:
+            features = [ArticleFeatures.of(article) for article in articles]
+        domains = [article.get('domain', '').lower() for article in articles]
+        domain_infos = {domain: self.db.get_domain_info(domain) for domain in set(domains)}
+        source_scores = np.array([
+            self.check_source_authenticity(article, domain_infos[domain])[0]
+            for article, domain in zip(articles, domains)
+        ])
+
+        word_counts = np.array([f.word_count for f in features])
+        caps_ratios = np.array([f.caps_ratio for f in features])
+
+        content_scores = np.full(len(articles), 0.5)
+        content_scores = np.where(caps_ratios > 0.5, np.maximum(0, content_scores - 0.2), content_scores)
+        content_scores = np.where(word_counts < 50, np.maximum(0, content_scores - 0.3), content_scores)
+        overall_scores = (source_scores * 0.6) + (content_scores * 0.4)
+
+        low_score = overall_scores < 0.3
+        too_short = ~low_score & (word_counts < 20)
+        decisions = []
+        for i, article_data in enumerate(articles):
+            article_data['source_trust_score'] = float(source_scores[i])
+            article_data['source_trust_reason'] = article_data['domain_reason']
+            article_data['content_trust_score'] = float(content_scores[i])
+            article_data['overall_authenticity_score'] = float(overall_scores[i])
+            if low_score[i]:
+                decisions.append(('BLOCK', 'Low authenticity score. Article likely unreliable.'))
+            elif too_short[i]:
+                decisions.append(('BLOCK', 'Content too short for reliable analysis.'))
+            else:
+                decisions.append(('PASS', 'Passed authenticity check.'))
+        return decisions
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""Offline scoring of article dumps with Stage1Pipeline.
+
+    python -m Stage_1_Filtering.bulk_score articles.jsonl -o scores.jsonl --workers 8
+
+The input is JSONL (one object per line) or CSV with a text (or content) field
+and optional title, url, domain and id fields. Articles are scored in chunks
+by worker processes and one JSON line per article is written, in input order,
+as soon as its chunk is done. Only a few chunks per worker are in flight at a
+time, so memory stays flat however large the dump is. URLs are never fetched;
+without a domain field the article's domain is taken from its url.
+"""
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from itertools import islice
+
+from config.settings import BULK_CHUNK_SIZE, BULK_CHUNKS_PER_WORKER
+from Stage_1_Filtering.pipeline import Stage1Pipeline
+
+RESULT_FIELDS = (
+    'domain', 'title', 'filter_decision', 'filter_reason', 'rule_decision', 'rule_reason', 'ready_for_stage2',
+    'overall_authenticity_score', 'source_trust_score', 'content_trust_score', 'domain_status', 'word_count',
+    'ratings_version',
+)
+
+# Pipeline of this process. Workers forked after score_file builds it inherit it;
+# under other start methods the initializer builds their own.
+_pipeline = None
+
+
+def _init_worker():
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = Stage1Pipeline()
+
+
+def read_articles(path, fmt='jsonl'):
+    """Yield the records of a JSONL or CSV file one at a time."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            # Article bodies easily exceed the csv module's default field limit
+            csv.field_size_limit(2 ** 31 - 1)
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunked(records, size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _item(record):
+    url = record.get('url') or ''
+    domain = record.get('domain') or (_pipeline.collector.extract_domain(url) if url else 'user_input')
+    return {
+        'input_type': 'text',
+        'content': record.get('text') or record.get('content') or '',
+        'title': record.get('title') or '',
+        'domain': domain,
+    }
+
+
+def _json_value(value):
+    # Missing ratings are NaN, which strict JSON readers reject
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _output_line(record, result=None, error=None):
+    row = {'id': record.get('id')}
+    if record.get('url'):
+        row['url'] = record['url']
+    if error is not None:
+        row['error'] = error
+    else:
+        row.update((field, _json_value(result.get(field))) for field in RESULT_FIELDS)
+    return json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def score_chunk(records):
+    """Score a list of records; returns their output lines in order."""
+    try:
+        results = _pipeline.process_batch([_item(record) for record in records], use_cache=False)
+    except Exception:
+        # Score the chunk one by one so a single bad record only fails itself
+        lines = []
+        for record in records:
+            try:
+                result = _pipeline.process_batch([_item(record)], use_cache=False)[0]
+            except Exception as e:
+                lines.append(_output_line(record, error=str(e)))
+            else:
+                lines.append(_output_line(record, result))
+        return lines
+    return [_output_line(record, result) for record, result in zip(records, results)]
+
+
+def _imap_bounded(pool, func, chunks, max_pending):
+    # Pool.imap reads its input as fast as it can; hold the reader back so at
+    # most max_pending chunks are queued or being scored
+    slots = threading.BoundedSemaphore(max_pending)
+
+    def throttled():
+        for chunk in chunks:
+            slots.acquire()
+            yield chunk
+
+    for lines in pool.imap(func, throttled()):
+        slots.release()
+        yield lines
+
+
+def score_file(path, fmt='jsonl', workers=1, chunk_size=BULK_CHUNK_SIZE):
+    """Yield the output lines of every chunk of the file at path, in input order."""
+    chunks = chunked(read_articles(path, fmt), chunk_size)
+    _init_worker()
+    if workers <= 1:
+        yield from map(score_chunk, chunks)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        yield from _imap_bounded(pool, score_chunk, chunks, workers * BULK_CHUNKS_PER_WORKER)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='JSONL or CSV file of articles')
+    parser.add_argument('-o', '--output', default='-', help='JSONL file to write (default: stdout)')
+    parser.add_argument('--format', choices=('jsonl', 'csv'),
+                        help='input format (default: csv for .csv files, jsonl otherwise)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='scoring processes')
+    parser.add_argument('--chunk-size', type=int, default=BULK_CHUNK_SIZE, help='articles per work unit')
+    args = parser.parse_args(argv)
+    fmt = args.format or ('csv' if args.input.lower().endswith('.csv') else 'jsonl')
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    count = 0
+    started = time.monotonic()
+    try:
+        for lines in score_file(args.input, fmt, args.workers, args.chunk_size):
+            out.writelines(lines)
+            count += len(lines)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.monotonic() - started
+    rate = count / elapsed if elapsed else 0.0
+    print(f"Scored {count} articles in {elapsed:.1f}s: {rate:.0f} articles/s, "
+          f"{rate / max(1, args.workers):.0f} per worker", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,45 +1,71 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import logging
 from urllib.parse import urlparse
+from Stage_1_Filtering.article_record import ArticleRecord
+from Stage_1_Filtering.fetcher import FetchEngine
+from Stage_1_Filtering.html_extractor import extract_article
 
 class NewsDataCollector:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'Mozilla/5.0'})
+    def __init__(self, fetcher=None):
+        self.fetcher = fetcher or FetchEngine()
+        self.session = self.fetcher.session
     
     def collect_from_url(self, url):
         try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            title = soup.find('title').text if soup.find('title') else ""
-            content = ""
-            for tag in ['article', 'div.content', 'div.story']:
-                element = soup.select_one(tag)
-                if element:
-                    content = element.get_text()
-                    break
-            return {
-                'url': url,
-                'domain': self.extract_domain(url),
-                'title': title,
-                'content': content,
-                'collection_timestamp': datetime.now().isoformat()
-            }
+            response = self.fetcher.fetch(url)
+            return self._parse_article(url, response)
         except Exception as e:
             logging.error(f"URL collection error for {url}: {str(e)}")
             return None
 
+    def collect_from_response(self, url, response):
+        """Parse a response fetched elsewhere; None if it cannot be parsed."""
+        try:
+            return self._parse_article(url, response)
+        except Exception as e:
+            logging.error(f"URL collection error for {url}: {str(e)}")
+            return None
+
+    def collect_many(self, urls):
+        """Fetch and parse urls concurrently; returns article data or None per url, in order."""
+        articles = []
+        for url, response in zip(urls, self.fetcher.fetch_many(urls)):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                articles.append(self._parse_article(url, response))
+            except Exception as e:
+                logging.error(f"URL collection error for {url}: {str(e)}")
+                articles.append(None)
+        return articles
+
+    def _parse_article(self, url, response):
+        title, content = extract_article(response.content)
+        return ArticleRecord(
+            url=url,
+            domain=self.extract_domain(url),
+            title=title,
+            content=content,
+            final_url=response.url,
+            redirect_chain=self.redirect_chain(response),
+            collection_timestamp=datetime.now().isoformat()
+        )
+
+    def redirect_chain(self, response):
+        """Every hop of the fetch, from the requested URL to the final one."""
+        return [
+            {'url': hop.url, 'status_code': hop.status_code}
+            for hop in list(response.history) + [response]
+        ]
+
     def collect_from_text_input(self, text, title="", source="user_input"):
-        return {
-            'content': text,
-            'title': title,
-            'domain': source,
-            'collection_timestamp': datetime.now().isoformat(),
-            'source_type': 'manual_input'
-        }
+        return ArticleRecord(
+            content=text,
+            title=title,
+            domain=source,
+            collection_timestamp=datetime.now().isoformat(),
+            source_type='manual_input'
+        )
 
     def extract_domain(self, url):
         domain = urlparse(url).netloc.lower()
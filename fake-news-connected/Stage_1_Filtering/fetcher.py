@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import FETCH_DEADLINE, FETCH_MAX_BYTES, FETCH_MAX_WORKERS, FETCH_PER_HOST_LIMIT, FETCH_TIMEOUT
+
+# Bytes read from the socket at a time while downloading a body
+CHUNK_SIZE = 64 * 1024
+
+
+class FetchDeadlineExceeded(Exception):
+    pass
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+class _HostQueue:
+    __slots__ = ('active', 'waiting')
+
+    def __init__(self):
+        self.active = 0
+        # (future, url, deadline_at) of fetches waiting for one of the host's slots
+        self.waiting = deque()
+
+
+class FetchEngine:
+    """Thread-pool HTTP fetcher with a shared connection pool.
+
+    Every call is bounded by an overall deadline, and at most per_host_limit
+    requests run against the same host at once. Further requests to a busy
+    host wait in that host's queue without taking a worker thread, so one slow
+    site cannot hold a worker for longer than the deadline or starve fetches
+    to other hosts. Bodies are streamed and the download stops once it passes
+    max_bytes.
+    """
+
+    def __init__(self, max_workers=FETCH_MAX_WORKERS, per_host_limit=FETCH_PER_HOST_LIMIT,
+                 timeout=FETCH_TIMEOUT, deadline=FETCH_DEADLINE, max_bytes=FETCH_MAX_BYTES):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+        self.per_host_limit = per_host_limit
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'Mozilla/5.0'})
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+        # Hosts with fetches running or queued; a host is dropped once it has neither
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _submit(self, url, deadline_at):
+        future = Future()
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            queue = self._hosts.get(host)
+            if queue is None:
+                queue = self._hosts[host] = _HostQueue()
+            if queue.active < self.per_host_limit:
+                queue.active += 1
+                self.executor.submit(self._run, host, future, url, deadline_at)
+            else:
+                queue.waiting.append((future, url, deadline_at))
+        return future
+
+    def _run(self, host, future, url, deadline_at):
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self._fetch(url, deadline_at))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            self._next(host)
+
+    def _next(self, host):
+        # Hand the finished fetch's slot to the host's next live request, or free it
+        with self._lock:
+            queue = self._hosts[host]
+            while queue.waiting:
+                future, url, deadline_at = queue.waiting.popleft()
+                if not future.cancelled():
+                    self.executor.submit(self._run, host, future, url, deadline_at)
+                    return
+            queue.active -= 1
+            if not queue.active:
+                del self._hosts[host]
+
+    def _fetch(self, url, deadline_at):
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise FetchDeadlineExceeded(f"Deadline exceeded waiting for a connection to {url}")
+        response = self.session.get(url, timeout=min(self.timeout, remaining), stream=True)
+        try:
+            response.raise_for_status()
+            self._read_body(response, url, deadline_at)
+        finally:
+            # Returns the connection to the pool, or drops it if the body was abandoned
+            response.close()
+        return response
+
+    def _read_body(self, response, url, deadline_at):
+        length = response.headers.get('Content-Length', '')
+        if self.max_bytes and length.isdigit() and int(length) > self.max_bytes:
+            raise ResponseTooLarge(f"{url} is {length} bytes, over the {self.max_bytes} byte limit")
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(CHUNK_SIZE):
+            size += len(chunk)
+            if self.max_bytes and size > self.max_bytes:
+                raise ResponseTooLarge(f"{url} is over the {self.max_bytes} byte limit")
+            if time.monotonic() > deadline_at:
+                raise FetchDeadlineExceeded(f"Deadline exceeded downloading {url}")
+            chunks.append(chunk)
+        # What Response.content does itself, so callers read the body as usual
+        response._content = b''.join(chunks)
+        response._content_consumed = True
+
+    def submit(self, url, deadline=None):
+        """Start fetching url in the pool and return its concurrent.futures.Future."""
+        return self._submit(url, time.monotonic() + (deadline or self.deadline))
+
+    def fetch_many(self, urls, deadline=None):
+        """Fetch urls concurrently; returns a response or an exception per url, in order."""
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        futures = [self._submit(url, deadline_at) for url in urls]
+        done, _ = wait(futures, timeout=max(0, deadline_at - time.monotonic()))
+        results = []
+        for url, future in zip(urls, futures):
+            if future in done:
+                results.append(future.exception() or future.result())
+            else:
+                future.cancel()
+                results.append(FetchDeadlineExceeded(f"Deadline exceeded fetching {url}"))
+        return results
+
+    def fetch(self, url, deadline=None):
+        """Fetch a single url, raising on HTTP errors, timeouts or the deadline."""
+        result = self.fetch_many([url], deadline)[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
@@ -0,0 +1,80 @@
+"""Text extraction from uploaded files, read straight from the upload stream.
+
+Each format yields its text piece by piece (PDF pages, DOCX paragraphs, chunks
+of a text file) and extract_text stops reading once the preprocessor would
+reject the article as too long anyway, so a 500-page PDF costs about as much
+as the first pages that fill the word budget.
+"""
+import codecs
+from contextlib import closing
+
+from config.settings import MAX_ARTICLE_LENGTH
+
+TEXT_CHUNK_SIZE = 1 << 16
+
+
+def iter_pdf_text(stream):
+    import pdfplumber
+    with pdfplumber.open(stream) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() or ""
+            # Drop the page's parsed layout objects before moving on
+            page.close()
+
+
+def iter_docx_text(stream):
+    from docx import Document
+    for para in Document(stream).paragraphs:
+        yield para.text
+
+
+def iter_plain_text(stream):
+    # An incremental decoder only needs read(), which every upload stream has;
+    # TextIOWrapper also wants readable(), missing on SpooledTemporaryFile before 3.11
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in iter(lambda: stream.read(TEXT_CHUNK_SIZE), b''):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    yield decoder.decode(b'', final=True)
+
+
+def join_within_budget(pieces, sep="", max_words=MAX_ARTICLE_LENGTH):
+    """Join pieces with sep ('' or whitespace), stopping once the text has more than max_words words.
+
+    Up to that point the result is the full join, so length checks on it decide
+    exactly as they would on the whole document.
+    """
+    parts = []
+    words = 0
+    # Whether the text so far ends inside a word that the next piece continues
+    open_word = False
+    for i, piece in enumerate(pieces):
+        if i and sep:
+            parts.append(sep)
+            open_word = False
+        parts.append(piece)
+        if not piece:
+            continue
+        words += len(piece.split())
+        if open_word and not piece[0].isspace():
+            words -= 1
+        open_word = not piece[-1].isspace()
+        if words > max_words:
+            break
+    return "".join(parts)
+
+
+def extract_text(filename, stream, max_words=MAX_ARTICLE_LENGTH):
+    """Text of an uploaded file, read from its binary stream up to the word budget."""
+    # Extensions are matched like ParsePool.handles matches them, whatever their case
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        pieces, sep = iter_pdf_text(stream), ""
+    elif name.endswith('.docx'):
+        pieces, sep = iter_docx_text(stream), "\n"
+    else:
+        pieces, sep = iter_plain_text(stream), ""
+    # Closing the generator stops the parser as soon as the budget is reached
+    with closing(pieces):
+        return join_within_budget(pieces, sep, max_words)
@@ -0,0 +1,61 @@
+"""Title and article text of a fetched HTML page.
+
+The page is parsed by libxml2 (lxml), which only has to find the <title> and
+the first content container. Just those two elements are handed to
+BeautifulSoup, so the text comes out as it would from a BeautifulSoup parse of
+the whole page, without building a Python object for every tag of it.
+"""
+from bs4 import BeautifulSoup, UnicodeDammit
+from lxml import etree
+from lxml import html as lxml_html
+
+# Where the article text is looked for, in order of preference (CSS selectors)
+CONTENT_SELECTORS = ('article', 'div.content', 'div.story')
+
+
+def _first_match_xpath(selector):
+    # XPath for the first element matching a tag or tag.class selector
+    tag, _, cls = selector.partition('.')
+    if not cls:
+        return f"(//{tag})[1]"
+    return f"(//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')])[1]"
+
+
+_TITLE = etree.XPath(_first_match_xpath('title'))
+_CONTAINERS = tuple(etree.XPath(_first_match_xpath(selector)) for selector in CONTENT_SELECTORS)
+
+
+def _from_soup(soup):
+    title = soup.find('title')
+    title = title.text if title else ""
+    content = ""
+    for selector in CONTENT_SELECTORS:
+        element = soup.select_one(selector)
+        if element:
+            content = element.get_text()
+            break
+    return title, content
+
+
+def _decode(markup):
+    # The same encoding detection BeautifulSoup applies to bytes
+    if isinstance(markup, str):
+        return markup
+    return UnicodeDammit(markup, is_html=True).unicode_markup
+
+
+def extract_article(markup):
+    """(title, content) of an HTML page given as bytes or str; empty strings for missing parts."""
+    try:
+        root = lxml_html.document_fromstring(_decode(markup))
+    except (etree.ParserError, ValueError):
+        # Empty documents, or str input with an XML encoding declaration
+        return _from_soup(BeautifulSoup(markup, 'html.parser'))
+    elements = _TITLE(root)
+    for container in _CONTAINERS:
+        found = container(root)
+        if found:
+            elements += found
+            break
+    fragment = ''.join(lxml_html.tostring(element, encoding='unicode', with_tail=False) for element in elements)
+    return _from_soup(BeautifulSoup(fragment, 'html.parser'))
@@ -0,0 +1,66 @@
+"""NLTK data used by the preprocessor, kept in a directory bundled with the app.
+
+Fetch it once per deploy with ``python -m Stage_1_Filtering.nltk_resources``.
+Workers only check that it is there; importing the preprocessor never touches
+the network. The stopword list does not need NLTK data at all: it is a frozen
+copy of NLTK's English list in data/stopwords_english.txt.
+"""
+import logging
+import sys
+
+import nltk
+
+from config.settings import NLTK_AUTO_DOWNLOAD, NLTK_DATA_PATH, STOPWORDS_PATH
+
+
+def punkt_resource():
+    """Return (download name, nltk.data path) of the English Punkt model for this nltk."""
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer  # noqa: F401 - nltk >= 3.8.2
+    except ImportError:
+        return 'punkt', 'tokenizers/punkt/english.pickle'
+    return 'punkt_tab', 'tokenizers/punkt_tab/english/'
+
+
+def use_bundled_data():
+    """Search the bundled directory before NLTK's default locations."""
+    if NLTK_DATA_PATH not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_PATH)
+
+
+def is_installed(resource_path):
+    try:
+        nltk.data.find(resource_path)
+    except LookupError:
+        return False
+    return True
+
+
+def ensure_resources(download=NLTK_AUTO_DOWNLOAD):
+    """Verify the Punkt model, downloading it into NLTK_DATA_PATH if allowed.
+
+    Returns True if it is available. A missing model only matters for
+    TOKENIZER_MODE 'nltk'; the fast tokenizer then runs without abbreviations.
+    """
+    use_bundled_data()
+    name, resource_path = punkt_resource()
+    if is_installed(resource_path):
+        return True
+    if download:
+        nltk.download(name, download_dir=NLTK_DATA_PATH, quiet=True)
+        if is_installed(resource_path):
+            return True
+    logging.warning(f"NLTK resource {name} not found; run python -m Stage_1_Filtering.nltk_resources")
+    return False
+
+
+def load_stopwords(path=STOPWORDS_PATH):
+    with open(path, encoding='utf-8') as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+if __name__ == "__main__":
+    ok = ensure_resources(download=True)
+    print(f"{punkt_resource()[0]}: {'ok' if ok else 'missing'} ({NLTK_DATA_PATH})")
+    print(f"stopwords: {len(load_stopwords())} words ({STOPWORDS_PATH})")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,210 @@
+"""Bounded process pool for parsing uploaded PDF and DOCX files.
+
+Parsing runs in separate processes so a pathological document can neither pin
+a request worker nor take it down. Every job gets a CPU time limit enforced by
+the kernel (RLIMIT_CPU) and a wall-clock timeout, and once every process is
+busy and the queue is full, new uploads are rejected instead of waiting.
+"""
+import importlib
+import io
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+try:
+    import resource
+except ImportError:  # Windows: no CPU limit, the wall-clock timeout still applies
+    resource = None
+
+from config.settings import (MAX_ARTICLE_LENGTH, PARSE_CPU_LIMIT, PARSE_POOL_WORKERS, PARSE_QUEUE_DEPTH,
+                             PARSE_TIMEOUT)
+from Stage_1_Filtering.file_extractor import extract_text
+
+
+class ParsePoolSaturated(Exception):
+    pass
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+class ParseCPULimitExceeded(Exception):
+    pass
+
+
+# Set in the parse process while a job runs: whether its CPU limit already fired
+_over_limit = False
+
+
+def _cpu_limit_exceeded(signum, frame):
+    global _over_limit
+    if _over_limit:
+        # The parser swallowed the first signal; the pool replaces this process
+        os._exit(1)
+    _over_limit = True
+    raise ParseCPULimitExceeded("Document took too long to parse")
+
+
+def _init_parse_worker():
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _cpu_limit_exceeded)
+    # Import the parsers up front so the first job's CPU limit does not pay for it
+    for module in ('pdfplumber', 'docx'):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+def _parse(extractor, filename, data, cpu_limit, max_words):
+    global _over_limit
+    _over_limit = False
+    if resource is None or not cpu_limit:
+        return extractor(filename, io.BytesIO(data), max_words)
+    # RLIMIT_CPU counts the whole life of the process, so the soft limit is
+    # moved to the CPU time used so far plus this job's allowance
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(usage.ru_utime + usage.ru_stime) + cpu_limit
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    try:
+        return extractor(filename, io.BytesIO(data), max_words)
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+class ParsePool:
+    """Process pool for document parsing with bounded queueing.
+
+    At most workers + max_queue jobs are accepted at once; submit raises
+    ParsePoolSaturated beyond that. The pool processes are started on first
+    use in each process, so an instance built in the gunicorn master is safe
+    to inherit in forked workers.
+    """
+
+    extensions = ('.pdf', '.docx')
+
+    def __init__(self, workers=PARSE_POOL_WORKERS, max_queue=PARSE_QUEUE_DEPTH, cpu_limit=PARSE_CPU_LIMIT,
+                 timeout=PARSE_TIMEOUT, max_words=MAX_ARTICLE_LENGTH, extractor=extract_text):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.cpu_limit = cpu_limit
+        self.timeout = timeout
+        self.max_words = max_words
+        # Runs in the pool processes, so it must be a picklable module-level function
+        self.extractor = extractor
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._executor = None
+        self._in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cpu_limited = 0
+        self.restarts = 0
+
+    def handles(self, filename):
+        return filename.lower().endswith(self.extensions)
+
+    def _get_executor(self):
+        # Called with the lock held
+        if self._pid != os.getpid():
+            # Forked from the process that created the pool: its executor is not ours
+            self._reset()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_parse_worker)
+        return self._executor
+
+    def _finished(self, executor, future):
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                self.completed += 1
+                return
+            self.failed += 1
+            if isinstance(error, ParseCPULimitExceeded):
+                self.cpu_limited += 1
+            elif isinstance(error, BrokenProcessPool) and self._executor is executor:
+                # A parse process died (crash, or ignored its CPU limit); start a fresh pool
+                self._discard_executor()
+
+    def _discard_executor(self):
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        self.restarts += 1
+
+    def submit(self, filename, data):
+        """Queue parsing of the uploaded bytes; returns a concurrent.futures.Future of the text."""
+        args = (self.extractor, filename, data, self.cpu_limit, self.max_words)
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ParsePoolSaturated("Too many documents are being parsed, try again later")
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_parse, *args)
+            except BrokenProcessPool:
+                self._discard_executor()
+                executor = self._get_executor()
+                future = executor.submit(_parse, *args)
+            self._in_flight += 1
+            self.submitted += 1
+        future.add_done_callback(partial(self._finished, executor))
+        return future
+
+    def timed_out_waiting(self, future):
+        """Record that the caller gave up on future, and return the ParseTimeout to raise."""
+        # A queued job is dropped; a running one keeps its process until it finishes
+        # or its CPU limit stops it, and stays counted in the meantime
+        future.cancel()
+        with self._lock:
+            self.timed_out += 1
+        return ParseTimeout(f"Document was not parsed within {self.timeout} seconds")
+
+    def extract(self, filename, data):
+        """Parse the uploaded bytes in the pool and wait for the text."""
+        future = self.submit(filename, data)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise self.timed_out_waiting(future)
+
+    def stats(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'running': min(self._in_flight, self.workers),
+                'queued': max(0, self._in_flight - self.workers),
+                'utilization': min(self._in_flight, self.workers) / self.workers,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'cpu_limited': self.cpu_limited,
+                'restarts': self.restarts,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
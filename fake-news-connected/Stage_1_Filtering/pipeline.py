@@ -1,44 +1,179 @@
 import logging
+from time import perf_counter
+from Stage_1_Filtering.article_features import ArticleFeatures
 from Stage_1_Filtering.data_collector import NewsDataCollector
 from Stage_1_Filtering.authenticity_filter import AuthenticityFilter
 from Stage_1_Filtering.preprocessor import NewsPreprocessor
-from config.settings import WHOISXML_API_KEY
-from urlworkxml import detect_phishing, get_domain, check_redirection
+from Stage_1_Filtering.result_cache import ResultCache, text_cache_key, url_cache_key
+from Stage_1_Filtering.stage_metrics import StageMetrics, StageTimer
+from config.settings import RESULT_CACHE_TEXT_TTL, RESULT_CACHE_URL_TTL
+from urlworkxml import get_domain
+
+BATCH_INPUT_TYPES = ('text', 'url')
+
+def batch_item_error(item):
+    """Why a process_batch item cannot be analyzed, or None if it can."""
+    if not isinstance(item, dict):
+        return 'Each item must be an object'
+    if item.get('input_type', 'text') not in BATCH_INPUT_TYPES:
+        return 'Unknown input type'
+    # Missing or null fields count as empty, anything else must be text
+    for field in ('content', 'title', 'domain'):
+        if item.get(field) is not None and not isinstance(item[field], str):
+            return f'{field} must be a string'
+    return None
 
 class Stage1Pipeline:
     def __init__(self):
         self.collector = NewsDataCollector()
         self.auth_filter = AuthenticityFilter()
         self.preprocessor = NewsPreprocessor()
+        # Cached verdicts from an older ratings release are recomputed after a reload. The
+        # version is read with a reload check of its own: in async mode this process only
+        # serves the cache while the pool processes do the lookups that would trigger it
+        self.result_cache = ResultCache(ratings_version=self.auth_filter.db.current_version)
+        self.metrics = StageMetrics()
         self.logger = logging.getLogger(__name__)
     
     def process_url(self, url):
+        timer = StageTimer()
+        key = url_cache_key(url)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            self.metrics.record(timer, 'url', cached, cached=True)
+            return cached
+
+        article_data = self._collect_url(url, timer)
+        result = self._analyze_collected(article_data, timer) if article_data else None
+        self.result_cache.put(key, result, RESULT_CACHE_URL_TTL)
+        self.metrics.record(timer, 'url', result)
+        return result
+    
+    def process_text(self, text, title="", input_type='text'):
+        """Analyze submitted text; input_type ('text' or 'file') only labels the metrics."""
+        timer = StageTimer()
+        key = text_cache_key(text, title)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            self.metrics.record(timer, input_type, cached, cached=True)
+            return cached
+
+        result = self.analyze_text(text, title, input_type=input_type)
+        self.result_cache.put(key, result, RESULT_CACHE_TEXT_TTL)
+        return result
+
+    def analyze_text(self, text, title="", domain="user_input", input_type='text'):
+        """process_text without the result cache."""
+        timer = StageTimer()
+        article_data = self.collector.collect_from_text_input(text, title, domain)
+        features = ArticleFeatures.of(article_data, self.preprocessor)
+        started = perf_counter()
+        decision, reason = self.auth_filter.apply_authenticity_filter(article_data, features)
+        timer.mark('authenticity', started)
+        result = self._finish(article_data, decision, reason, timer, features)
+        self.metrics.record(timer, input_type, result)
+        return result
+
+    def analyze_response(self, url, response):
+        """process_url for a page that has already been fetched, without the result cache.
+
+        This is the CPU-bound part of a URL analysis; the async server runs it in
+        a process pool while the fetch itself is awaited.
+        """
+        timer = StageTimer()
+        article_data = self.collector.collect_from_response(url, response)
+        result = self._analyze_collected(article_data, timer) if article_data else None
+        self.metrics.record(timer, 'url', result)
+        return result
+
+    def _analyze_collected(self, article_data, timer):
+        started = perf_counter()
+        self._attach_domain_check(article_data)
+        timer.mark('domain_check', started)
+        features = ArticleFeatures.of(article_data, self.preprocessor)
+        started = perf_counter()
+        decision, reason = self.auth_filter.apply_authenticity_filter(article_data, features)
+        timer.mark('authenticity', started)
+        return self._finish(article_data, decision, reason, timer, features)
+
+    def process_batch(self, items, use_cache=True):
+        """Process many {'input_type', 'content', 'title', 'domain'} items in one call.
+
+        Authenticity scoring runs once over the whole batch; results come back in
+        input order, with None for items that could not be collected and for
+        invalid ones, which batch_item_error explains. With
+        use_cache=False the result cache is neither read nor filled, as when
+        re-scoring an archive whose articles are each seen once.
+        """
+        timer = StageTimer()
+        results = [None] * len(items)
+        collected = [None] * len(items)
+        keys = [None] * len(items)
+        url_positions = []
+        for i, item in enumerate(items):
+            if batch_item_error(item) is not None:
+                continue
+            input_type = item.get('input_type', 'text')
+            if use_cache:
+                if input_type == 'url':
+                    keys[i] = url_cache_key(item.get('content') or '')
+                else:
+                    keys[i] = text_cache_key(
+                        item.get('content') or '', item.get('title') or '', item.get('domain') or 'user_input'
+                    )
+                results[i] = self.result_cache.get(keys[i])
+                if results[i] is not None:
+                    continue
+            if input_type == 'url':
+                url_positions.append(i)
+            else:
+                collected[i] = self.collector.collect_from_text_input(
+                    item.get('content') or '', item.get('title') or '', item.get('domain') or 'user_input'
+                )
+
+        # URLs are fetched concurrently instead of one round trip after another
+        urls = [items[i].get('content') or '' for i in url_positions]
+        if urls:
+            started = perf_counter()
+            fetched = self.collector.collect_many(urls)
+            timer.mark('fetch', started)
+            started = perf_counter()
+            for i, article_data in zip(url_positions, fetched):
+                if article_data:
+                    self._attach_domain_check(article_data)
+                collected[i] = article_data
+            timer.mark('domain_check', started)
+
+        positions = [i for i, article_data in enumerate(collected) if article_data]
+        articles = [collected[i] for i in positions]
+        features = [ArticleFeatures.of(article_data, self.preprocessor) for article_data in articles]
+        started = perf_counter()
+        decisions = self.auth_filter.apply_authenticity_filter_batch(articles, features)
+        timer.mark('authenticity', started)
+        started = perf_counter()
+        for i, article_data, article_features, (decision, reason) in zip(positions, articles, features, decisions):
+            results[i] = self._finish(article_data, decision, reason, features=article_features)
+            if use_cache:
+                ttl = RESULT_CACHE_URL_TTL if 'url' in article_data else RESULT_CACHE_TEXT_TTL
+                self.result_cache.put(keys[i], results[i], ttl)
+        timer.mark('preprocess', started)
+        # Stage times of a batch cover all its items, whatever each item's decision
+        self.metrics.record(timer, 'batch', None, decision='mixed')
+        return results
+
+    def _collect_url(self, url, timer):
         self.logger.info(f"Processing URL: {url}")
+        started = perf_counter()
         article_data = self.collector.collect_from_url(url)
-        if not article_data: 
-            return None
-
-        domain = article_data.get('domain')
-        if domain and WHOISXML_API_KEY:
-            phishing_result = self._run_domain_check(url, domain)
-            article_data['domain_check'] = phishing_result
+        timer.mark('fetch', started)
+        return article_data or None
 
-        decision, reason = self.auth_filter.apply_authenticity_filter(article_data)
-        article_data.update({
-            'filter_decision': decision,
-            'filter_reason': reason
-        })
-        if decision == 'BLOCK':
-            return article_data
+    def _attach_domain_check(self, article_data):
+        # The collector already followed the redirects, so this needs no extra request
+        if article_data.get('domain') and article_data.get('final_url'):
+            article_data['domain_check'] = self._run_domain_check(article_data)
 
-        processed = self.preprocessor.preprocess_article(article_data)
-        processed['ready_for_stage2'] = processed['rule_decision'] == 'PASS'
-        return processed
-    
-    def process_text(self, text, title=""):
-        article_data = self.collector.collect_from_text_input(text, title)
-        
-        decision, reason = self.auth_filter.apply_authenticity_filter(article_data)
+    def _finish(self, article_data, decision, reason, timer=None, features=None):
         article_data.update({
             'filter_decision': decision,
             'filter_reason': reason
@@ -46,13 +181,17 @@ class Stage1Pipeline:
         if decision == 'BLOCK':
             return article_data
         
-        processed = self.preprocessor.preprocess_article(article_data)
+        started = perf_counter()
+        processed = self.preprocessor.preprocess_article(article_data, features)
+        if timer is not None:
+            timer.mark('preprocess', started)
         processed['ready_for_stage2'] = processed['rule_decision'] == 'PASS'
         return processed
 
-    def _run_domain_check(self, url, domain):
-        final_url = check_redirection(url)
-        if final_url and get_domain(final_url) != domain:
+    def _run_domain_check(self, article_data):
+        url = article_data['url']
+        final_url = article_data['final_url']
+        if get_domain(final_url) != get_domain(url):
             return {
                 'risk': 'High',
                 'warning': 'Suspicious redirection detected',
@@ -1,56 +1,275 @@
 import re
+from functools import lru_cache
 import nltk
-from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
+from nltk.tokenize.punkt import PunktLanguageVars
 from nltk.stem import PorterStemmer
-from config.settings import MIN_ARTICLE_LENGTH, MAX_ARTICLE_LENGTH
+from config.settings import MIN_ARTICLE_LENGTH, MAX_ARTICLE_LENGTH, STEM_CACHE_SIZE, STEM_VOCABULARY_PATH, TOKENIZER_MODE
+from Stage_1_Filtering.article_features import ArticleFeatures
+from Stage_1_Filtering.article_record import ArticleRecord
+from Stage_1_Filtering.nltk_resources import ensure_resources, load_stopwords, punkt_resource, use_bundled_data
 
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
+# Data is fetched at deploy time (python -m Stage_1_Filtering.nltk_resources), never on import
+use_bundled_data()
+STOP_WORDS = load_stopwords()
+
+# HTML tags and URLs. A URL runs on across embedded tags, as if tags had been removed first.
+_MARKUP = r'<[^>]+>|http(?:<[^>]+>)*(?!<[^>]+>)\S(?:<[^>]+>|\S)*'
+_MARKUP_PATTERN = re.compile(_MARKUP)
+# Markup plus every character outside [\w\s.,!?-], removed in a single scan. Junk runs
+# stop at '<' so a following tag is still matched as a whole.
+_STRIP_PATTERN = re.compile(_MARKUP + r'|[^\w\s.,!?<-]+|<')
+# Deletion table for the junk characters of ASCII text
+_ASCII_JUNK = {c: None for c in range(128) if not re.match(r'[\w\s.,!?-]', chr(c))}
+
+# Fast tokenizer for clean_text output, which only holds [\w\s.,!?-]. word_tokenize runs
+# Punkt to find sentence ends, then the Treebank word tokenizer on each sentence; on this
+# alphabet that comes down to where ',.!?' split off a word. fast_tokenize gets the same
+# tokens from one regex scan plus the few Punkt rules below. tests/test_preprocessor.py
+# holds the two to identical output on news text.
+#
+# Each match is (token, whitespace after it); Punkt judges a period together with the
+# whitespace-separated chunk that follows it, so the whitespace is kept.
+_FAST_TOKEN_PATTERN = re.compile(r"""
+    (
+        (?:
+            [^\s,!?.-]+                     # letters, digits and underscores
+          | -(?!-)                          # a single hyphen stays inside a word: r-texas, 52-48
+          | \.(?!\.|,(?!\d)|[!?](?!\S))     # an inner period: u.s, 3.5 (see the next line for the rest)
+          | ,(?=\d)                         # a comma before a digit: 1,000
+        )+
+        # A period right before a comma or before a closing !? is scanned with the word
+        # ('smith.,' or 'left.!'); Punkt rarely ends a sentence there, and fast_tokenize
+        # splits the comma or mark off again
+        (?:\.(?:,(?!\d)|[!?](?!\S)))?
+      | \.{2,}                              # a run of dots is one token: ...
+      | --                                  # a double dash is one token
+      | ,
+      | [!?]
+      | \.
+    )
+    (\s*)
+""", re.VERBOSE)
+# Punkt types: numbers, and single-letter initials
+_NUMBER_PATTERN = re.compile(r'[.,]?\d[\d,.-]*$')
+_INITIAL_PATTERN = re.compile(r'[^\W\d]$')
+_PUNCTUATION = frozenset('.,!?')
+_SENTENCE_ENDS = ('.', '!', '?')
+_MARKS = ('!', '?')
+_punkt_words = PunktLanguageVars().word_tokenize
+# Words the Treebank tokenizer always splits in two
+_SPLIT_WORDS = {
+    'cannot': ('can', 'not'), 'gimme': ('gim', 'me'), 'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'), 'lemme': ('lem', 'me'), 'wanna': ('wan', 'na'),
+}
+
+@lru_cache(maxsize=None)
+def punkt_abbreviations():
+    """Abbreviations of the English Punkt model; empty if the model is not installed."""
+    name, resource_path = punkt_resource()
+    try:
+        if name == 'punkt_tab':
+            from nltk.tokenize.punkt import PunktTokenizer
+            params = PunktTokenizer('english')._params
+        else:
+            params = nltk.data.load(resource_path)._params
+    except LookupError:
+        return frozenset()
+    return frozenset(params.abbrev_types)
+
+def _ends_sentence(word, next_token, abbreviations):
+    """Punkt's verdict on word followed by a period, given the token after it.
+
+    A known abbreviation (sen., co., also the last part of a hyphenated word) never
+    ends a sentence. An initial (j.) or a number (2020.) does unless the next token
+    is lowercase or punctuation. Any other word always does.
+    """
+    # Punkt never starts a word with '-', so '-o.' is the initial 'o.'
+    word = word.lstrip('-')
+    if word in abbreviations or word.rsplit('-', 1)[-1] in abbreviations:
+        return False
+    # Initials and numbers followed by a lowercase word or punctuation do not end a sentence
+    if _INITIAL_PATTERN.match(word) or _NUMBER_PATTERN.match(word):
+        return not (next_token[0].islower() or next_token in _PUNCTUATION)
+    return True
+
+def _period_ends_sentence(token, next_token, abbreviations):
+    """_ends_sentence for a token that ends in a single period (word., not word...)."""
+    return len(token) > 1 and token[-1] == '.' and token[-2] != '.' and _ends_sentence(
+        token[:-1], next_token, abbreviations)
+
+def _chunk_breaks(scanned, start, abbreviations):
+    """Whether Punkt ends a sentence inside the chunk starting at scanned[start], before its last word.
+
+    A chunk is the run of scanned tokens up to the next whitespace. Punkt then also ends
+    one at the period in front of the chunk: in 'sen. smith., said' the chunk 'smith.,'
+    holds a sentence end, so 'sen.' splits into 'sen' and '.' although sen is an
+    abbreviation. Only asked about periods that stay on their word, so the chunk is
+    split into words the way Punkt does it rather than trusting the scan.
+    """
+    end = start
+    while end < len(scanned) - 1 and not scanned[end][1]:
+        end += 1
+    words = _punkt_words(''.join(token for token, _ in scanned[start:end + 1]))
+    for word, next_word in zip(words, words[1:]):
+        if word in _SENTENCE_ENDS:
+            return True
+        if word[-1] == '.' and not word.endswith('..') and _ends_sentence(word[:-1], next_word, abbreviations):
+            return True
+    return False
+
+def _before_mark_run(scanned, i):
+    """Whether scanned[i] is directly followed by two or more of '!?', as in 'wow.?!'.
+
+    Punkt ends that sentence after the marks, not at the period, so the word keeps its
+    period ('wow.', '?', '!') whatever _ends_sentence would say.
+    """
+    return (not scanned[i][1] and i + 2 < len(scanned) and scanned[i + 1][0] in _MARKS
+            and not scanned[i + 1][1] and scanned[i + 2][0] in _MARKS)
+
+def _after_inner_comma(scanned, i):
+    """Whether scanned[i] is glued to the word before it by a comma, as mr. in 'said,mr.'.
+
+    Punkt sees 'said,mr.' as a single word, which is no abbreviation, initial or number,
+    so its period always ends the sentence ('said', ',', 'mr', '.').
+    """
+    return i > 1 and scanned[i - 1] == (',', '') and not scanned[i - 2][1] and scanned[i - 2][0][-1].isalnum()
+
+def fast_tokenize(text):
+    """Regex equivalent of word_tokenize for lowercased clean_text output.
+
+    Per scanned token:
+    - A trailing ',', '!' or '?' (scanned as 'smith.,' or 'left.!') becomes its own
+      token. At the end of the text the period before a '!' or '?' splits off too.
+    - A trailing single period splits off where Punkt ends a sentence there: at the
+      end of the text, after a comma-glued word (_after_inner_comma), where
+      _ends_sentence says so, or where the next chunk holds a sentence end
+      (_chunk_breaks). It stays on the word before a run of marks (_before_mark_run).
+    - Words the Treebank tokenizer splits (cannot, gonna, ...) are split, shedding a
+      period they kept.
+    """
+    abbreviations = punkt_abbreviations()
+    scanned = _FAST_TOKEN_PATTERN.findall(text)
+    last = len(scanned) - 1
+    result = []
+    for i, (token, space) in enumerate(scanned):
+        end = None
+        if len(token) > 1:
+            if token[-1] in ',!?':
+                token, end = token[:-1], token[-1]
+                # At the end of the text Punkt also ends a sentence at the period of 'word.!'
+                if i == last and end != ',' and _period_ends_sentence(token, end, abbreviations):
+                    token, end = token[:-1], '.' + end
+            elif token[-1] == '.' and token[-2] != '.':
+                # The end of the text always ends a sentence
+                if i == last or not _before_mark_run(scanned, i) and (
+                        _after_inner_comma(scanned, i)
+                        or _ends_sentence(token[:-1], scanned[i + 1][0], abbreviations)
+                        or space and _chunk_breaks(scanned, i + 1, abbreviations)):
+                    token, end = token[:-1], '.'
+        split = _SPLIT_WORDS.get(token)
+        if split:
+            result.extend(split)
+        elif token[-1] == '.' and token[:-1] in _SPLIT_WORDS and token != 'wanna.':
+            # The split pads the word with spaces, so a kept period comes off too
+            result.extend(_SPLIT_WORDS[token[:-1]])
+            result.append('.')
+        else:
+            result.append(token)
+        if end:
+            # One or two punctuation tokens, each a single character
+            result.extend(end)
+    return result
+
+# News vocabulary is Zipfian, so a bounded cache in front of the stemmer absorbs most calls.
+# It is shared by every NewsPreprocessor in the process.
+_stemmer = PorterStemmer()
+cached_stem = lru_cache(maxsize=STEM_CACHE_SIZE)(_stemmer.stem)
+
+def warm_stem_cache(path):
+    """Pre-stem a vocabulary file (one word per line, most frequent first)."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            word = line.strip().lower()
+            if word:
+                cached_stem(word)
+
+def stem_cache_info():
+    info = cached_stem.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+_vocabulary_warmed = False
+_resources_checked = False
 
 class NewsPreprocessor:
     def __init__(self):
-        self.stemmer = PorterStemmer()
-        self.stop_words = set(stopwords.words('english'))
+        global _vocabulary_warmed, _resources_checked
+        self.stemmer = _stemmer
+        self.stop_words = STOP_WORDS
+        if not _resources_checked:
+            ensure_resources()
+            _resources_checked = True
+        if STEM_VOCABULARY_PATH and not _vocabulary_warmed:
+            warm_stem_cache(STEM_VOCABULARY_PATH)
+            _vocabulary_warmed = True
     
     def clean_text(self, text):
         if not text:
             return ""
-        text = re.sub(r'<[^>]+>', '', text)
-        text = re.sub(r'http\S+', '', text)
-        text = re.sub(r'[^\w\s.,!?-]', '', text)
-        return re.sub(r'\s+', ' ', text).strip()
+        if text.isascii():
+            # str.translate drops ASCII junk far faster than a regex character class
+            text = _MARKUP_PATTERN.sub('', text).translate(_ASCII_JUNK)
+        else:
+            text = _STRIP_PATTERN.sub('', text)
+        # split/join collapses whitespace and strips the ends without another regex pass
+        return ' '.join(text.split())
     
     def tokenize_text(self, text):
-        text = self.clean_text(text).lower()
-        tokens = word_tokenize(text)
+        return self.tokenize_clean(self.clean_text(text))
+
+    def tokenize_clean(self, clean_text):
+        """Tokenize text that has already been through clean_text."""
+        text = clean_text.lower()
+        tokens = fast_tokenize(text) if TOKENIZER_MODE == 'fast' else word_tokenize(text)
         return [token for token in tokens if token not in self.stop_words and len(token) > 2]
     
     def stem_tokens(self, tokens):
-        return [self.stemmer.stem(token) for token in tokens]
+        return list(map(cached_stem, tokens))
     
-    def apply_processing_rules(self, article_data):
-        content = article_data.get('content', '')
-        word_count = len(content.split())
+    def apply_processing_rules(self, article_data, features=None):
+        if features is None:
+            features = ArticleFeatures.of(article_data)
+        word_count = features.word_count
         if word_count < MIN_ARTICLE_LENGTH:
             return 'BLOCK', 'Content too short'
         if word_count > MAX_ARTICLE_LENGTH:
             return 'BLOCK', 'Content too long'
-        if not article_data.get('title', '').strip():
+        if not features.title.strip():
             return 'BLOCK', 'Missing title'
         return 'PASS', 'Passed preprocessing'
     
-    def preprocess_article(self, article_data):
-        rule_decision, rule_reason = self.apply_processing_rules(article_data)
-        processed = article_data.copy()
+    def preprocess_article(self, article_data, features=None):
+        if features is None:
+            features = ArticleFeatures.of(article_data)
+        if features.preprocessor is None:
+            features.preprocessor = self
+        rule_decision, rule_reason = self.apply_processing_rules(article_data, features)
+        # The pipeline's records are updated in place; plain dicts are left as they were
+        processed = article_data if isinstance(article_data, ArticleRecord) else article_data.copy()
         processed.update({
             'rule_decision': rule_decision,
             'rule_reason': rule_reason
         })
         if rule_decision == 'PASS':
-            content = processed.get('content', '')
-            processed['content_clean'] = self.clean_text(content)
-            tokens = self.tokenize_text(content)
+            processed['content_clean'] = features.content_clean
+            tokens = features.tokens
             processed['content_tokens'] = tokens
             processed['content_stemmed'] = self.stem_tokens(tokens)
             processed['word_count'] = len(tokens)
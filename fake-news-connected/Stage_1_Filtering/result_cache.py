@@ -0,0 +1,84 @@
+import copy
+import hashlib
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from caching.ttl_cache import TieredCache
+from config.settings import RESULT_CACHE_PATH, RESULT_CACHE_PURGE_INTERVAL, RESULT_CACHE_SIZE
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _digest(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def text_cache_key(text, title="", domain="user_input"):
+    """Key for submitted text: whitespace differences do not change the analysis."""
+    return 'text:' + _digest(domain, ' '.join(title.split()), ' '.join(text.split()))
+
+
+def canonical_url(url):
+    """Lowercase scheme and host, drop default ports, fragments and utm_* tracking parameters."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        host = f'[{host}]'
+    try:
+        port = parts.port
+    except ValueError:
+        return url.strip()
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{port}'
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not k.lower().startswith('utm_')])
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def url_cache_key(url):
+    return 'url:' + _digest(canonical_url(url))
+
+
+class ResultCache:
+    """Bounded cache of Stage 1 results, optionally shared by all workers through SQLite.
+
+    A hit has the same fields as the result that was stored. Entries are deep
+    copies in both directions, so neither the caller that stored a result nor
+    one that reads it can change what the cache holds. ratings_version, if given,
+    returns the version of the domain ratings in use; results produced from
+    another version are treated as misses.
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, path=RESULT_CACHE_PATH, ratings_version=None,
+                 purge_interval=RESULT_CACHE_PURGE_INTERVAL):
+        self.cache = TieredCache(maxsize, path, table='results', purge_interval=purge_interval)
+        self.ratings_version = ratings_version
+        self.stale = 0
+        self._stale_lock = threading.Lock()
+
+    def get(self, key):
+        """Return a deep copy of the cached result flagged with cache_hit, or None."""
+        result = self.cache.get(key)
+        if result is None:
+            return None
+        if self.ratings_version is not None and result.get('ratings_version') != self.ratings_version():
+            with self._stale_lock:
+                self.stale += 1
+            return None
+        result = copy.deepcopy(result)
+        result['cache_hit'] = True
+        return result
+
+    def put(self, key, result, ttl):
+        if result is None:
+            return
+        result['cache_hit'] = False
+        self.cache.set(key, copy.deepcopy(result), ttl)
+
+    def stats(self):
+        return dict(self.cache.stats(), stale=self.stale)
@@ -0,0 +1,167 @@
+"""Latency histograms of the Stage1Pipeline stages, exported in Prometheus text format.
+
+Counters live in an anonymous shared memory map created with the pipeline.
+Under gunicorn the pipeline is built in the master, so every forked worker
+(and every process forked from a worker) writes into the same map, each to
+its own slot, and /metrics on any worker reports the sum over all of them.
+A slot left by a dead process is taken over by the next one, so totals only
+ever grow while the master runs.
+"""
+import mmap
+import multiprocessing
+import os
+import threading
+import weakref
+from bisect import bisect_left
+from time import perf_counter
+
+from config.settings import METRICS_MAX_PROCESSES
+
+STAGES = ('fetch', 'domain_check', 'authenticity', 'preprocess', 'total', 'cached')
+INPUT_TYPES = ('text', 'url', 'file', 'batch')
+DECISIONS = ('PASS', 'BLOCK', 'error', 'mixed')
+
+# Upper bounds (seconds) of the histogram buckets; a last bucket catches the rest
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_SERIES = {
+    (stage, input_type, decision): i
+    for i, (stage, input_type, decision) in enumerate(
+        (s, t, d) for s in STAGES for t in INPUT_TYPES for d in DECISIONS
+    )
+}
+# Per series: one count per bucket, the +Inf bucket, then the sum of observed seconds
+_STRIDE = len(BUCKETS) + 2
+_SUM = len(BUCKETS) + 1
+
+_registries = weakref.WeakSet()
+
+
+def _after_fork():
+    for registry in _registries:
+        registry._slot = None
+        registry._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def decision_of(result):
+    """Label of a pipeline result: PASS, BLOCK, or error when there is none."""
+    if result is None:
+        return 'error'
+    return 'PASS' if result.get('ready_for_stage2') else 'BLOCK'
+
+
+class StageTimer:
+    """Stage durations of one analysis, recorded into StageMetrics at the end."""
+
+    __slots__ = ('started', 'stages')
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.stages = []
+
+    def mark(self, stage, started):
+        """Add the time from started (a perf_counter() value) to now as stage."""
+        self.stages.append((stage, perf_counter() - started))
+
+
+class StageMetrics:
+    """Histograms of stage latency by stage, input type and decision."""
+
+    def __init__(self, max_processes=METRICS_MAX_PROCESSES):
+        self.max_processes = max_processes
+        series_size = len(_SERIES) * _STRIDE
+        self._mm = mmap.mmap(-1, max_processes * 8 + max_processes * series_size * 8)
+        view = memoryview(self._mm)
+        self._owners = view[:max_processes * 8].cast('q')
+        self._values = view[max_processes * 8:].cast('d')
+        self._series_size = series_size
+        self._claim_lock = multiprocessing.Lock()
+        self._lock = threading.Lock()
+        self._slot = None
+        self._private = None
+        _registries.add(self)
+
+    def _claim_slot(self):
+        pid = os.getpid()
+        with self._claim_lock:
+            for slot in range(self.max_processes):
+                owner = self._owners[slot]
+                if owner == pid:
+                    break
+                if owner == 0 or not _alive(owner):
+                    self._owners[slot] = pid
+                    break
+            else:
+                slot = -1
+        if slot < 0:
+            # Every slot is taken: count in memory only this process sees
+            if self._private is None:
+                self._private = memoryview(bytearray(self._series_size * 8)).cast('d')
+            self._slot = (self._private, 0)
+        else:
+            self._slot = (self._values, slot * self._series_size)
+        return self._slot
+
+    def observe(self, stage, input_type, decision, seconds):
+        values, base = self._slot or self._claim_slot()
+        base += _SERIES[(stage, input_type, decision)] * _STRIDE
+        bucket = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            values[base + bucket] += 1
+            values[base + _SUM] += seconds
+
+    def record(self, timer, input_type, result, cached=False, decision=None):
+        """Record every stage of timer plus the total time since it started."""
+        total = perf_counter() - timer.started
+        decision = decision or decision_of(result)
+        for stage, seconds in timer.stages:
+            self.observe(stage, input_type, decision, seconds)
+        self.observe('cached' if cached else 'total', input_type, decision, total)
+
+    def _totals(self):
+        size = self._series_size
+        totals = [0.0] * size
+        for slot in range(self.max_processes):
+            if self._owners[slot]:
+                part = self._values[slot * size:(slot + 1) * size]
+                totals = [a + b for a, b in zip(totals, part)]
+        if self._private is not None:
+            totals = [a + b for a, b in zip(totals, self._private)]
+        return totals
+
+    def render(self):
+        """The histograms in Prometheus text exposition format, series without samples left out."""
+        totals = self._totals()
+        name = 'stage1_stage_duration_seconds'
+        lines = [
+            f'# HELP {name} Time spent in each Stage1Pipeline stage.',
+            f'# TYPE {name} histogram',
+        ]
+        for (stage, input_type, decision), i in _SERIES.items():
+            counts = totals[i * _STRIDE:i * _STRIDE + len(BUCKETS) + 1]
+            count = sum(counts)
+            if not count:
+                continue
+            labels = f'stage="{stage}",input_type="{input_type}",decision="{decision}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative:.0f}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count:.0f}')
+            lines.append(f'{name}_sum{{{labels}}} {totals[i * _STRIDE + _SUM]!r}')
+            lines.append(f'{name}_count{{{labels}}} {count:.0f}')
+        return '\n'.join(lines) + '\n'
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
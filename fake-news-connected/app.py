@@ -1,52 +1,70 @@
-from flask import Flask, render_template, request, jsonify
-from Stage_1_Filtering.pipeline import Stage1Pipeline
-import tempfile
-import os
-import pdfplumber
-from docx import Document
-
-app = Flask(__name__)
-pipeline = Stage1Pipeline()
-
-def extract_text_from_pdf(file_path):
-    with pdfplumber.open(file_path) as pdf:
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
-
-def extract_text_from_docx(file_path):
-    doc = Document(file_path)
-    return "\n".join(para.text for para in doc.paragraphs)
-
-@app.route('/')
+from flask import Blueprint, Flask, Response, current_app, render_template, request, jsonify
+from Stage_1_Filtering.pipeline import Stage1Pipeline, batch_item_error
+from Stage_1_Filtering.file_extractor import extract_text
+from Stage_1_Filtering.parse_pool import ParseCPULimitExceeded, ParsePool, ParsePoolSaturated, ParseTimeout
+from config.settings import MAX_BATCH_SIZE
+
+# Seconds clients are asked to wait before retrying an upload the parse pool turned away
+RETRY_AFTER = 5
+
+bp = Blueprint('stage1', __name__)
+
+def create_app(pipeline=None, parse_pool=None):
+    """Build the app around pipeline, or a new Stage1Pipeline.
+
+    Under gunicorn (see gunicorn.conf.py) this runs once in the master, so the
+    pipeline's read-only data is shared by every forked worker. Each worker
+    starts its own parse processes on its first PDF or DOCX upload.
+    """
+    app = Flask(__name__)
+    app.extensions['stage1_pipeline'] = pipeline or Stage1Pipeline()
+    app.extensions['stage1_parse_pool'] = parse_pool or ParsePool()
+    app.register_blueprint(bp)
+    return app
+
+def __getattr__(name):
+    # `app` for `gunicorn app:app`, `flask run` and `from app import app`. It is built
+    # on first access, so importing create_app (tests, benchmarks) builds no pipeline
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_app = None
+
+def get_pipeline():
+    return current_app.extensions['stage1_pipeline']
+
+def get_parse_pool():
+    return current_app.extensions['stage1_parse_pool']
+
+def extract_upload(uploaded_file):
+    parse_pool = get_parse_pool()
+    if parse_pool.handles(uploaded_file.filename):
+        return parse_pool.extract(uploaded_file.filename, uploaded_file.read())
+    return extract_text(uploaded_file.filename, uploaded_file.stream)
+
+@bp.route('/')
 def index():
     return render_template('index2.html')
 
-@app.route('/analyze', methods=['POST'])
+@bp.route('/analyze', methods=['POST'])
 def analyze():
     input_type = request.form.get('input_type')
     try:
         if input_type == 'text':
             text = request.form.get('content')
             title = request.form.get('title', '')
-            result = pipeline.process_text(text, title)
+            result = get_pipeline().process_text(text, title)
         elif input_type == 'url':
             url = request.form.get('content')
-            result = pipeline.process_url(url)
+            result = get_pipeline().process_url(url)
         elif input_type == 'file':
             uploaded_file = request.files['file']
-            _, temp_path = tempfile.mkstemp()
-            uploaded_file.save(temp_path)
-            if uploaded_file.filename.endswith('.pdf'):
-                text = extract_text_from_pdf(temp_path)
-            elif uploaded_file.filename.endswith('.docx'):
-                text = extract_text_from_docx(temp_path)
-            else:
-                with open(temp_path, 'r') as f:
-                    text = f.read()
-            result = pipeline.process_text(text)
-            os.remove(temp_path)
+            text = extract_upload(uploaded_file)
+            result = get_pipeline().process_text(text, input_type='file')
         else:
             return jsonify({'status': 'error', 'message': 'Unknown input type'})
         
@@ -57,9 +75,50 @@ def analyze():
             'status': 'success',
             'result': simplify_result(result)
         })
+    except ParsePoolSaturated as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 429, {'Retry-After': str(RETRY_AFTER)}
+    except ParseTimeout as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 503, {'Retry-After': str(RETRY_AFTER)}
+    except ParseCPULimitExceeded as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 422
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+@bp.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    payload = request.get_json(silent=True)
+    items = payload.get('items') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'status': 'error', 'message': 'No items provided'})
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({'status': 'error', 'message': f'Batch exceeds {MAX_BATCH_SIZE} items'})
+    # A bad item fails in its own slot; the rest of the batch is still analyzed
+    errors = [batch_item_error(item) for item in items]
+    try:
+        results = get_pipeline().process_batch(items)
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
+    responses = []
+    for error, result in zip(errors, results):
+        if error is not None:
+            responses.append({'status': 'error', 'message': error})
+        elif result is None:
+            responses.append({'status': 'error', 'message': 'Failed to process input'})
+        else:
+            responses.append({'status': 'success', 'result': simplify_result(result)})
+    return jsonify({'status': 'success', 'results': responses})
+
+@bp.route('/stats')
+def stats():
+    # Counters of the worker that answers; each gunicorn worker has its own pool
+    return jsonify({'parse_pool': get_parse_pool().stats()})
+
+@bp.route('/metrics')
+def metrics():
+    # Stage latency histograms summed over all workers, for Prometheus to scrape
+    return Response(get_pipeline().metrics.render(), mimetype='text/plain; version=0.0.4')
+
 def simplify_result(full_result):
     return {
         'domain': full_result.get('domain'),
@@ -67,13 +126,16 @@ def simplify_result(full_result):
         'risk_score': full_result.get('overall_authenticity_score', 0) * 100 if 'overall_authenticity_score' in full_result else 0,
         'verdict': 'Genuine' if full_result.get('ready_for_stage2') else 'Fake',
         'warnings': full_result.get('filter_reason') or full_result.get('rule_reason'),
+        'cached': full_result.get('cache_hit', False),
+        'ratings_version': full_result.get('ratings_version'),
         'detailed_analysis': {
             'source_trust': full_result.get('source_trust_score', 0),
             'content_trust': full_result.get('content_trust_score', 0),
             'linguistic_analysis': full_result.get('content_tokens', [])[:20] if 'content_tokens' in full_result else [],
-            'domain_check': full_result.get('domain_check')
+            'domain_check': full_result.get('domain_check'),
+            'redirect_chain': full_result.get('redirect_chain')
         }
     }
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
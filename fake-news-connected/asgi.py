@@ -0,0 +1,253 @@
+"""Async serving mode: the API of app.py as an ASGI app.
+
+    gunicorn -k uvicorn.workers.UvicornWorker 'asgi:create_app()'
+
+URL fetches are awaited on the pipeline's fetch threads, so a slow origin only
+holds a coroutine. Parsing, scoring and preprocessing run in a pool of
+processes forked from each server worker, so CPU-bound analyses neither block
+the event loop nor wait behind network I/O for the GIL.
+"""
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from time import perf_counter
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from starlette.templating import Jinja2Templates
+
+from app import RETRY_AFTER, simplify_result
+from config.settings import (ASYNC_CPU_WORKERS, MAX_BATCH_SIZE, RESULT_CACHE_TEXT_TTL,
+                             RESULT_CACHE_URL_TTL, TEMPLATES_DIR)
+from Stage_1_Filtering.file_extractor import extract_text
+from Stage_1_Filtering.parse_pool import ParseCPULimitExceeded, ParsePool, ParsePoolSaturated, ParseTimeout
+from Stage_1_Filtering.pipeline import Stage1Pipeline, batch_item_error
+from Stage_1_Filtering.result_cache import text_cache_key, url_cache_key
+from Stage_1_Filtering.stage_metrics import StageTimer, decision_of
+
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
+
+# Pipeline of this process. Pool processes forked after create_app inherit it;
+# under other start methods the initializer builds their own.
+_pipeline = None
+
+
+def _init_cpu_worker():
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = Stage1Pipeline()
+
+
+def _analyze_text(text, title, domain, input_type):
+    return _pipeline.analyze_text(text, title, domain, input_type)
+
+
+def _analyze_response(url, response):
+    return _pipeline.analyze_response(url, response)
+
+
+def _extract_upload(filename, data):
+    return extract_text(filename, io.BytesIO(data))
+
+
+def _start_cpu_pool():
+    return ProcessPoolExecutor(max_workers=ASYNC_CPU_WORKERS, initializer=_init_cpu_worker)
+
+
+def _replace_cpu_pool(app, broken):
+    # Every call that saw the pool break gets here; only the first one replaces it
+    if app.state.cpu_pool is broken:
+        broken.shutdown(wait=False)
+        app.state.cpu_pool = _start_cpu_pool()
+        app.state.cpu_pool_restarts += 1
+    return app.state.cpu_pool
+
+
+async def _run_cpu(app, fn, *args):
+    """Run fn in the CPU pool, starting a new pool if a process of the current one died."""
+    loop = asyncio.get_running_loop()
+    pool = app.state.cpu_pool
+    try:
+        future = loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        # Broken by an earlier job; this one never started, so it runs on the new pool
+        pool = _replace_cpu_pool(app, pool)
+        future = loop.run_in_executor(pool, fn, *args)
+    try:
+        return await future
+    except BrokenProcessPool:
+        # A pool process crashed or was killed (e.g. out of memory) while this job was in it
+        _replace_cpu_pool(app, pool)
+        raise
+
+
+async def extract_upload(app, filename, data):
+    parse_pool = app.state.parse_pool
+    if not parse_pool.handles(filename):
+        return await _run_cpu(app, _extract_upload, filename, data)
+    future = parse_pool.submit(filename, data)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), parse_pool.timeout)
+    except asyncio.TimeoutError:
+        raise parse_pool.timed_out_waiting(future)
+
+
+# Stage metrics: analyses record their own stages in the pool processes (sharing
+# the pipeline's metrics map); here only cache hits and the awaited fetch are added
+
+async def analyze_text(app, text, title="", domain="user_input", input_type='text'):
+    pipeline = app.state.pipeline
+    timer = StageTimer()
+    key = text_cache_key(text, title, domain)
+    cached = pipeline.result_cache.get(key)
+    if cached is not None:
+        pipeline.metrics.record(timer, input_type, cached, cached=True)
+        return cached
+    result = await _run_cpu(app, _analyze_text, text, title, domain, input_type)
+    pipeline.result_cache.put(key, result, RESULT_CACHE_TEXT_TTL)
+    return result
+
+
+async def analyze_url(app, url):
+    pipeline = app.state.pipeline
+    timer = StageTimer()
+    key = url_cache_key(url)
+    cached = pipeline.result_cache.get(key)
+    if cached is not None:
+        pipeline.metrics.record(timer, 'url', cached, cached=True)
+        return cached
+    fetcher = pipeline.collector.fetcher
+    started = perf_counter()
+    try:
+        response = await asyncio.wait_for(asyncio.wrap_future(fetcher.submit(url)), fetcher.deadline)
+    except Exception as e:
+        logging.error(f"URL collection error for {url}: {str(e)}")
+        pipeline.metrics.observe('fetch', 'url', 'error', perf_counter() - started)
+        return None
+    fetch_seconds = perf_counter() - started
+    result = await _run_cpu(app, _analyze_response, url, response)
+    pipeline.metrics.observe('fetch', 'url', decision_of(result), fetch_seconds)
+    pipeline.result_cache.put(key, result, RESULT_CACHE_URL_TTL)
+    return result
+
+
+async def index(request):
+    return templates.TemplateResponse(request, 'index2.html')
+
+
+async def analyze(request):
+    app = request.app
+    form = await request.form()
+    input_type = form.get('input_type')
+    try:
+        if input_type == 'text':
+            result = await analyze_text(app, form.get('content'), form.get('title', ''))
+        elif input_type == 'url':
+            result = await analyze_url(app, form.get('content'))
+        elif input_type == 'file':
+            uploaded_file = form['file']
+            text = await extract_upload(app, uploaded_file.filename, await uploaded_file.read())
+            result = await analyze_text(app, text, input_type='file')
+        else:
+            return JSONResponse({'status': 'error', 'message': 'Unknown input type'})
+
+        if result is None:
+            return JSONResponse({'status': 'error', 'message': 'Failed to process input'})
+
+        return JSONResponse({
+            'status': 'success',
+            'result': simplify_result(result)
+        })
+    except ParsePoolSaturated as e:
+        return JSONResponse({'status': 'error', 'message': str(e)}, 429, {'Retry-After': str(RETRY_AFTER)})
+    except ParseTimeout as e:
+        return JSONResponse({'status': 'error', 'message': str(e)}, 503, {'Retry-After': str(RETRY_AFTER)})
+    except ParseCPULimitExceeded as e:
+        return JSONResponse({'status': 'error', 'message': str(e)}, 422)
+    except Exception as e:
+        return JSONResponse({'status': 'error', 'message': str(e)})
+
+
+async def analyze_batch(request):
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = None
+    items = payload.get('items') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return JSONResponse({'status': 'error', 'message': 'No items provided'})
+    if len(items) > MAX_BATCH_SIZE:
+        return JSONResponse({'status': 'error', 'message': f'Batch exceeds {MAX_BATCH_SIZE} items'})
+    # A bad item fails in its own slot; the rest of the batch is still analyzed
+    errors = [batch_item_error(item) for item in items]
+
+    async def analyze_item(item, error):
+        if error is not None:
+            return None
+        if item.get('input_type', 'text') == 'url':
+            return await analyze_url(request.app, item.get('content') or '')
+        return await analyze_text(
+            request.app, item.get('content') or '', item.get('title') or '', item.get('domain') or 'user_input'
+        )
+
+    # Items run concurrently: fetches overlap and analyses spread over the pool
+    try:
+        results = await asyncio.gather(*(analyze_item(item, error) for item, error in zip(items, errors)))
+    except Exception as e:
+        return JSONResponse({'status': 'error', 'message': str(e)})
+
+    responses = []
+    for error, result in zip(errors, results):
+        if error is not None:
+            responses.append({'status': 'error', 'message': error})
+        elif result is None:
+            responses.append({'status': 'error', 'message': 'Failed to process input'})
+        else:
+            responses.append({'status': 'success', 'result': simplify_result(result)})
+    return JSONResponse({'status': 'success', 'results': responses})
+
+
+async def stats(request):
+    return JSONResponse({
+        'parse_pool': request.app.state.parse_pool.stats(),
+        'cpu_pool': {'workers': ASYNC_CPU_WORKERS, 'restarts': request.app.state.cpu_pool_restarts},
+    })
+
+
+async def metrics(request):
+    return PlainTextResponse(request.app.state.pipeline.metrics.render(), media_type='text/plain; version=0.0.4')
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Started per server worker, after gunicorn forked it from the preloaded master
+    app.state.cpu_pool = _start_cpu_pool()
+    app.state.cpu_pool_restarts = 0
+    try:
+        yield
+    finally:
+        app.state.cpu_pool.shutdown(wait=False)
+        app.state.parse_pool.shutdown()
+
+
+def create_app(pipeline=None, parse_pool=None):
+    """Build the ASGI app around pipeline, or a new Stage1Pipeline."""
+    global _pipeline
+    _pipeline = pipeline or Stage1Pipeline()
+    app = Starlette(
+        routes=[
+            Route('/', index),
+            Route('/analyze', analyze, methods=['POST']),
+            Route('/analyze/batch', analyze_batch, methods=['POST']),
+            Route('/stats', stats),
+            Route('/metrics', metrics),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.pipeline = _pipeline
+    app.state.parse_pool = parse_pool or ParsePool()
+    return app
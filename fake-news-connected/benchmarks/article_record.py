@@ -0,0 +1,114 @@
+"""Memory per pipeline result: slotted ArticleRecord against the plain dict it replaced.
+
+Scores --articles synthetic articles (150 to 1500 words) with process_batch
+and keeps every result, once as the ArticleRecord the pipeline returns and
+once converted to the plain dict of lists that the pipeline built before
+(dict(record) gives back exactly that). Each mode runs in a fresh process
+and reports the max RSS growth while scoring, and the memory the held
+results take (tracemalloc, in a second run) per article.
+
+    python benchmarks/article_record.py --articles 10000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+WORDS = ("government officials said the new policy would affect thousands of residents across the region "
+         "while critics argued that the measure was rushed through parliament on tuesday after a long "
+         "debate about taxes schools hospitals roads and the budget for next year").split()
+CHUNK = 200
+
+
+def max_rss():
+    """Peak resident memory of this process in KiB."""
+    # VmHWM starts afresh with the new program; ru_maxrss can keep the parent's peak across exec
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def items(count, seed):
+    rnd = random.Random(seed)
+    for i in range(count):
+        text = ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(150, 1500))) + '.'
+        yield {'input_type': 'text', 'content': text, 'title': f'Officials Say Policy {i}', 'domain': 'cnn.com'}
+
+
+def score(pipeline, count, seed, as_dict):
+    """Score count articles chunk by chunk, holding every result."""
+    results = []
+    batch = []
+    for i, item in enumerate(items(count, seed), 1):
+        batch.append(item)
+        if len(batch) == CHUNK or i == count:
+            scored = pipeline.process_batch(batch, use_cache=False)
+            results.extend([dict(result) for result in scored] if as_dict else scored)
+            batch = []
+    return results
+
+
+def measure(mode, count, seed, traced):
+    from Stage_1_Filtering.pipeline import Stage1Pipeline
+    pipeline = Stage1Pipeline()
+    pipeline.process_batch(list(items(20, seed + 1)), use_cache=False)
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+    before_rss, before_traced = max_rss(), tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    results = score(pipeline, count, seed, as_dict=mode == 'dict')
+    elapsed = time.perf_counter() - started
+    # The items generator keeps no article text alive, so what is left is the results
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before_traced
+    print(json.dumps({'rss_kib': max_rss() - before_rss, 'held_bytes': held, 'seconds': elapsed,
+                      'results': len(results)}))
+
+
+def run(mode, count, seed, traced):
+    command = [sys.executable, os.path.abspath(__file__), '--measure', mode, str(count), str(seed)]
+    if traced:
+        command.append('--traced')
+    output = subprocess.run(command, cwd=PROJECT_DIR, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--measure', nargs=3, metavar=('MODE', 'COUNT', 'SEED'), help=argparse.SUPPRESS)
+    parser.add_argument('--traced', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        mode, count, seed = args.measure
+        measure(mode, int(count), int(seed), args.traced)
+        return 0
+
+    print(f"{'results held as':<16} {'max RSS growth MiB':>19} {'KiB per article':>16} {'articles/s':>11}")
+    for mode, label in (('dict', 'dict (before)'), ('record', 'ArticleRecord')):
+        untraced = run(mode, args.articles, args.seed, traced=False)
+        traced = run(mode, args.articles, args.seed, traced=True)
+        print(f"{label:<16} {untraced['rss_kib'] / 1024:>19.1f} "
+              f"{traced['held_bytes'] / 1024 / traced['results']:>16.1f} "
+              f"{untraced['results'] / untraced['seconds']:>11.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Throughput and memory of the bulk scoring CLI on a synthetic article dump.
+
+Writes a JSONL dump per --articles size (40 to 700 words per article, a mix
+of records with a domain, with only a url, and bare text) and runs
+`python -m Stage_1_Filtering.bulk_score` on it once per --workers count,
+each run in a fresh process. Prints articles/sec and the peak RSS of the
+main process and of the largest worker, and checks that every worker count
+writes the same output.
+
+    python benchmarks/bulk_score.py --articles 2000 20000 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+WORDS = ("government officials said the new policy would affect thousands of residents across the region "
+         "while critics argued that the measure was rushed through parliament shocking secret cure doctors "
+         "hate this one trick breaking exclusive report sources confirmed on tuesday").split()
+DOMAINS = ['cnn.com', 'reuters.com', 'bbc.co.uk', 'infowars.com', 'naturalnews.com', 'example-news.net']
+
+
+def write_dump(path, articles, seed):
+    rnd = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(articles):
+            words = [rnd.choice(WORDS) for _ in range(rnd.randint(40, 700))]
+            record = {'id': i, 'title': ' '.join(words[:8]).title(), 'text': ' '.join(words) + '.'}
+            kind = i % 3
+            if kind == 0:
+                record['domain'] = rnd.choice(DOMAINS)
+            elif kind == 1:
+                record['url'] = f'https://www.{rnd.choice(DOMAINS)}/story/{i}'
+            f.write(json.dumps(record) + '\n')
+
+
+def max_rss():
+    """Peak resident memory of this process in KiB."""
+    # VmHWM starts afresh with the new program; ru_maxrss can keep the parent's peak across exec
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(dump, output, workers):
+    from Stage_1_Filtering import bulk_score
+    started = time.perf_counter()
+    bulk_score.main([dump, '-o', output, '--workers', workers])
+    elapsed = time.perf_counter() - started
+    print(json.dumps({'seconds': elapsed, 'main_kib': max_rss(),
+                      'worker_kib': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss}))
+
+
+def run(dump, output, workers):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', dump, output, str(workers)],
+                            cwd=PROJECT_DIR, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', nargs='+', type=int, default=[2000, 20000], help='articles per dump')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2], help='worker counts to run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--measure', nargs=3, metavar=('DUMP', 'OUTPUT', 'WORKERS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+        return 0
+
+    failed = False
+    print(f"{'articles':>8} {'workers':>7} {'articles/s':>11} {'per worker':>11} {'main MiB':>9} {'worker MiB':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for articles in args.articles:
+            dump = os.path.join(directory, f'dump_{articles}.jsonl')
+            write_dump(dump, articles, args.seed)
+            outputs = []
+            for workers in args.workers:
+                output = os.path.join(directory, f'scores_{articles}_{workers}.jsonl')
+                result = run(dump, output, workers)
+                rate = articles / result['seconds']
+                # With one worker the main process scores everything itself
+                worker_mib = f"{result['worker_kib'] / 1024:>11.1f}" if workers > 1 else f"{'-':>11}"
+                print(f"{articles:>8} {workers:>7} {rate:>11.0f} {rate / workers:>11.0f} "
+                      f"{result['main_kib'] / 1024:>9.1f} {worker_mib}")
+                with open(output, 'rb') as f:
+                    outputs.append(f.read())
+            if any(output != outputs[0] for output in outputs):
+                print(f"{articles} articles: output differs between worker counts")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
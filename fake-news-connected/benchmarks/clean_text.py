@@ -0,0 +1,92 @@
+"""Micro-benchmark of NewsPreprocessor.clean_text against the old four-pass cleaner.
+
+Builds synthetic articles (about 1% HTML tags and 0.5% URLs among the words,
+ASCII and with accented words), checks both cleaners agree on them and
+prints the mean latency per article and the peak memory traced while
+cleaning one article.
+
+    python benchmarks/clean_text.py --words 10000 --articles 50
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from Stage_1_Filtering.preprocessor import NewsPreprocessor  # noqa: E402
+
+WORDS = ("government officials said the new policy would affect thousands of residents across "
+         "the region while critics argued that the measure was rushed through parliament, "
+         "(according to reports) on 12 march; \"unprecedented\" & costly!").split()
+ACCENTED = ['café', 'naïve', 'société', 'über', 'señor']
+TAGS = ['<p>', '</p>', '<b>', '</b>', '<a href="/world">', '</a>', '<br/>']
+
+
+def old_clean_text(text):
+    """clean_text as it was: one re.sub pass per kind of junk."""
+    if not text:
+        return ""
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'http\S+', '', text)
+    text = re.sub(r'[^\w\s.,!?-]', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def article(words, rnd, accented):
+    vocabulary = WORDS + ACCENTED if accented else WORDS
+    parts = []
+    for _ in range(words):
+        roll = rnd.random()
+        if roll < 0.01:
+            parts.append(rnd.choice(TAGS))
+        elif roll < 0.015:
+            parts.append(f"https://news.example.com/{rnd.randrange(10**6)}?ref=feed")
+        else:
+            parts.append(rnd.choice(vocabulary))
+    return ' '.join(parts)
+
+
+def mean_latency(clean, articles):
+    started = time.perf_counter()
+    for text in articles:
+        clean(text)
+    return (time.perf_counter() - started) / len(articles)
+
+
+def peak_allocation(clean, text):
+    tracemalloc.start()
+    clean(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=10000, help='words per article')
+    parser.add_argument('--articles', type=int, default=50, help='articles per input kind')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    new_clean_text = NewsPreprocessor().clean_text
+    print(f"{'input':>10} {'cleaner':>8} {'ms/article':>11} {'peak KiB':>9}")
+    for kind, accented in (('ASCII', False), ('non-ASCII', True)):
+        articles = [article(args.words, rnd, accented) for _ in range(args.articles)]
+        mismatches = sum(old_clean_text(text) != new_clean_text(text) for text in articles)
+        for name, clean in (('old', old_clean_text), ('new', new_clean_text)):
+            latency = mean_latency(clean, articles)
+            peak = peak_allocation(clean, articles[0])
+            print(f"{kind:>10} {name:>8} {latency * 1000:>11.2f} {peak / 1024:>9.0f}")
+        if mismatches:
+            print(f"{kind}: {mismatches} of {len(articles)} articles cleaned differently")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Micro-benchmark of domain rating lookups: DataFrame scan vs hash index.
+
+Writes a synthetic domain_pc1.csv per size, loads it with and without the
+index (use_index=False is the old per-lookup DataFrame mask) and times
+get_domain_info over random queries, about half of them rated domains.
+Prints lookups/sec per size and mode; the slow scan runs until --seconds.
+
+    python benchmarks/domain_lookup.py --sizes 10000 100000 1000000 --queries 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from domain_quality.domain_quality import DomainQualityDB  # noqa: E402
+
+TLDS = ['com', 'org', 'net', 'co.uk', 'com.au', 'de', 'info']
+
+
+def synthetic_domain(rnd):
+    name = ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rnd.randint(5, 14)))
+    return f"{name}.{rnd.choice(TLDS)}"
+
+
+def write_csv(directory, size, rnd):
+    domains = set()
+    while len(domains) < size:
+        domains.add(synthetic_domain(rnd))
+    domains = sorted(domains)
+    path = os.path.join(directory, f'domain_pc1_{size}.csv')
+    with open(path, 'w') as f:
+        f.write('domain,pc1\n')
+        for domain in domains:
+            f.write(f"{domain},{rnd.random():.6f}\n")
+    return path, domains
+
+
+def make_queries(domains, count, rnd):
+    queries = []
+    for _ in range(count):
+        if rnd.random() < 0.5:
+            queries.append(rnd.choice(domains))
+        else:
+            queries.append(synthetic_domain(rnd))
+    return queries
+
+
+def lookups_per_second(db, queries, seconds):
+    done = 0
+    started = time.perf_counter()
+    for domain in queries:
+        db.get_domain_info(domain)
+        done += 1
+        if time.perf_counter() - started > seconds:
+            break
+    return done / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000, 1000000], help='rated domains')
+    parser.add_argument('--queries', type=int, default=20000, help='lookups per size')
+    parser.add_argument('--seconds', type=float, default=10, help='time limit of each mode per size')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    print(f"{'domains':>9} {'mode':>6} {'lookups/s':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        missing_ratings = os.path.join(directory, 'no_ratings.csv')
+        for size in args.sizes:
+            path, domains = write_csv(directory, size, rnd)
+            queries = make_queries(domains, args.queries, rnd)
+            for mode, use_index in (('scan', False), ('index', True)):
+                db = DomainQualityDB(path, use_index=use_index, ratings_path=missing_ratings,
+                                     snapshot_path=None, reload_interval=0)
+                rate = lookups_per_second(db, queries, args.seconds)
+                print(f"{size:>9} {mode:>6} {rate:>12,.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Benchmark of URL collection through the FetchEngine against a local stub server.
+
+Starts a threaded stub server that answers every page after --delay
+seconds, spreads the URLs of each batch over --hosts loopback addresses
+(127.0.0.1, 127.0.0.2, ...) and collects them with
+NewsDataCollector.collect_many. Prints URLs/sec per batch size next to
+the old path, one blocking requests.Session.get per URL.
+
+    python benchmarks/fetch.py --sizes 1 50 500 --delay 0.2 --hosts 50
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from Stage_1_Filtering.data_collector import NewsDataCollector  # noqa: E402
+
+PAGE = ('<html><head><title>Stub story</title></head><body><article>'
+        + 'word ' * 800 + '</article></body></html>').encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_stub(delay):
+    # Bound to every address so each 127.0.0.x counts as its own host
+    server = StubServer(('0.0.0.0', 0), StubHandler)
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serial_rate(urls):
+    session = requests.Session()
+    started = time.perf_counter()
+    for url in urls:
+        session.get(url, timeout=15)
+    return len(urls) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1, 50, 500], help='URLs per batch')
+    parser.add_argument('--delay', type=float, default=0.2, help='seconds the stub takes per page')
+    parser.add_argument('--hosts', type=int, default=50, help='loopback hosts the URLs are spread over')
+    parser.add_argument('--serial', type=int, default=10, help='URLs fetched one by one for the old path')
+    args = parser.parse_args()
+
+    server = start_stub(args.delay)
+    port = server.server_address[1]
+    collector = NewsDataCollector()
+    print(f"{'URLs':>5} {'collect_many URLs/s':>20} {'collected':>10} {'serial URLs/s':>14}")
+    for size in args.sizes:
+        urls = [f'http://127.0.0.{1 + i % args.hosts}:{port}/story/{i}' for i in range(size)]
+        started = time.perf_counter()
+        results = collector.collect_many(urls)
+        rate = size / (time.perf_counter() - started)
+        collected = sum(result is not None for result in results)
+        print(f"{size:>5} {rate:>20.1f} {collected:>10} {serial_rate(urls[:args.serial]):>14.1f}")
+    server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Micro-benchmark of extract_article against the old full html.parser parse.
+
+Reads the saved HTML fixtures in --fixtures (any *.html files), or first
+writes synthetic news pages of each --sizes KB there: navigation, scripts,
+ads and related-story blocks around an article in one of the layouts the
+extractor looks for. Checks both extractors return the same title and text and prints
+pages/sec and peak memory per size. Peak memory is the growth of max RSS
+while the largest page of the size is extracted in a fresh process, so
+libxml2's allocations are counted too.
+
+    python benchmarks/html_extract.py --sizes 50 200 1000 2000 5000 --fixtures /tmp/html_fixtures
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from Stage_1_Filtering.html_extractor import extract_article  # noqa: E402
+
+WORDS = ("government officials said the new policy would affect thousands of residents across "
+         "the region while critics argued that the measure was rushed through parliament").split()
+LAYOUTS = {
+    'article': '<div class="wrap"><article class="story main">{}</article></div>',
+    'content': '<div class="outer"><div class="body content\tfull">{}</div></div>',
+    'story': '<div class="story">{}</div>',
+    'none': '<main>{}</main>',
+}
+
+
+def old_extract_article(markup):
+    """The collector's extraction before html_extractor: one html.parser parse of the whole page."""
+    soup = BeautifulSoup(markup, 'html.parser')
+    title = soup.find('title').text if soup.find('title') else ""
+    content = ""
+    for selector in ['article', 'div.content', 'div.story']:
+        element = soup.select_one(selector)
+        if element:
+            content = element.get_text()
+            break
+    return title, content
+
+
+def text(rnd, words):
+    return ' '.join(rnd.choice(WORDS) for _ in range(words))
+
+
+def noise(rnd, size):
+    blocks, written = [], 0
+    while written < size:
+        kind = rnd.randrange(5)
+        if kind == 0:
+            block = '<script>var cfg = %s;</script>\n' % json.dumps({'k%d' % i: text(rnd, 5) for i in range(30)})
+        elif kind == 1:
+            block = '<nav class="menu"><ul>%s</ul></nav>\n' % ''.join(
+                f'<li><a href="/s/{i}">{text(rnd, 2)}</a>' for i in range(40))
+        elif kind == 2:
+            block = f'<div class="related"><div class="card"><h3>{text(rnd, 6)}</h3><p>{text(rnd, 40)}</div></div>\n'
+        elif kind == 3:
+            block = f'<!-- tracking {text(rnd, 20)} -->\n<style>.x{{color:red}}</style>\n'
+        else:
+            block = f'<svg><title>icon {text(rnd, 2)}</title><path d="M0 0"/></svg>\n'
+        blocks.append(block)
+        written += len(block)
+    return ''.join(blocks)
+
+
+def synthetic_page(rnd, kb, layout):
+    body = ''.join(f'<p>{text(rnd, rnd.randint(30, 90))}' + ('</p>' if rnd.random() < 0.7 else '')
+                   for _ in range(rnd.randint(8, 30)))
+    body += '<script>track("x < y && z")</script><p>Café naïve &eacute; &#8220;quoted&#8221;</p>'
+    article = LAYOUTS[layout].format(f'<h1>{text(rnd, 8)}</h1>{body}')
+    half = kb * 1024 // 2
+    return (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{text(rnd, 8)} &mdash; News</title>'
+            f'</head><body>{noise(rnd, half)}{article}{noise(rnd, half)}</body></html>').encode('utf-8')
+
+
+def write_fixtures(directory, sizes, seed):
+    rnd = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for kb in sizes:
+        for layout in LAYOUTS:
+            with open(os.path.join(directory, f'page_{kb:05d}k_{layout}.html'), 'wb') as f:
+                f.write(synthetic_page(rnd, kb, layout))
+
+
+def max_rss():
+    """Peak resident memory of this process in KiB."""
+    # VmHWM starts afresh with the new program; ru_maxrss can keep the parent's peak across exec
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def peak_rss_growth(extractor, path):
+    """KiB of max RSS added by extracting the page at path in a new process."""
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', extractor, path],
+                            check=True, capture_output=True, text=True).stdout
+    return float(output)
+
+
+def measure(extractor, path):
+    extract = old_extract_article if extractor == 'old' else extract_article
+    extract(b'<title>x</title><div class="content">y</div>')
+    with open(path, 'rb') as f:
+        markup = f.read()
+    before = max_rss()
+    extract(markup)
+    print(max_rss() - before)
+
+
+def pages_per_second(extract, pages, seconds):
+    done = 0
+    started = time.perf_counter()
+    while True:
+        for markup in pages:
+            extract(markup)
+        done += len(pages)
+        if time.perf_counter() - started > seconds:
+            return done / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default=os.path.join(tempfile.gettempdir(), 'html_fixtures'),
+                        help='directory of saved *.html pages, filled with synthetic ones if empty')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[50, 200, 1000, 2000, 5000],
+                        help='KB per synthetic page')
+    parser.add_argument('--seconds', type=float, default=3, help='minimum time per size and extractor')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--measure', nargs=2, metavar=('EXTRACTOR', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+        return 0
+
+    if not glob.glob(os.path.join(args.fixtures, '*.html')):
+        write_fixtures(args.fixtures, args.sizes, args.seed)
+    # Each page is reported under the closest of --sizes
+    by_size = {}
+    for path in glob.glob(os.path.join(args.fixtures, '*.html')):
+        kb = os.path.getsize(path) / 1024
+        by_size.setdefault(min(args.sizes, key=lambda size: abs(size - kb)), []).append(path)
+
+    failed = False
+    print(f"{'KB':>6} {'pages':>5} {'old pages/s':>12} {'old MiB':>8} {'new pages/s':>12} {'new MiB':>8}")
+    for kb, paths in sorted(by_size.items()):
+        pages = []
+        for path in sorted(paths):
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+        if any(old_extract_article(markup) != extract_article(markup) for markup in pages):
+            print(f"{kb} KB: extract_article differs from the old extraction")
+            failed = True
+        row = []
+        for name, extract in (('old', old_extract_article), ('new', extract_article)):
+            rate = pages_per_second(extract, pages, args.seconds)
+            peak = peak_rss_growth(name, max(paths, key=os.path.getsize))
+            row.append(f"{rate:>12.2f} {peak / 1024:>8.1f}")
+        print(f"{kb:>6} {len(pages):>5} {' '.join(row)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Load test of the sync (app.py) and async (asgi.py) serving modes.
+
+Starts a local stub origin that serves an article after a fixed delay, runs
+gunicorn in each mode against it and fires a mix of URL and text analyses
+from concurrent clients. Prints requests/sec and p50/p99 latency per kind.
+
+    python benchmarks/load_test.py --workers 2 --concurrency 32 --duration 20
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = ("government officials said the new policy would affect thousands of residents across "
+         "the region while critics argued that the measure was rushed through parliament").split()
+
+SERVER_COMMANDS = {
+    'sync': ['gunicorn', 'app:create_app()'],
+    'async': ['gunicorn', '-k', 'uvicorn.workers.UvicornWorker', 'asgi:create_app()'],
+}
+
+
+def article_text(words, seed):
+    rnd = random.Random(seed)
+    return ' '.join(rnd.choice(WORDS) for _ in range(words)) + '.'
+
+
+def start_origin(delay, words):
+    page = (f"<html><head><title>Stub article</title></head><body><article>"
+            f"{article_text(words, 0)}</article></body></html>").encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, workers, port):
+    command = SERVER_COMMANDS[mode] + ['-w', str(workers), '-b', f'127.0.0.1:{port}', '--timeout', '120']
+    proc = subprocess.Popen(command, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5).read()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+def percentile(values, q):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_load(base_url, origin_url, concurrency, duration, url_share, words):
+    samples = []
+    lock = threading.Lock()
+    counter = iter(range(10 ** 9))
+    stop_at = time.monotonic() + duration
+
+    def client(seed):
+        rnd = random.Random(seed)
+        while time.monotonic() < stop_at:
+            n = next(counter)
+            # Unique inputs so the result cache never answers
+            if rnd.random() < url_share:
+                kind, form = 'url', {'input_type': 'url', 'content': f'{origin_url}/news?n={n}'}
+            else:
+                kind, form = 'text', {'input_type': 'text', 'title': f'Report {n}', 'content': article_text(words, n)}
+            started = time.monotonic()
+            try:
+                with urllib.request.urlopen(f'{base_url}/analyze', data=urllib.parse.urlencode(form).encode(),
+                                            timeout=120) as response:
+                    ok = b'"success"' in response.read()
+            except OSError:
+                ok = False
+            with lock:
+                samples.append((kind, time.monotonic() - started, ok))
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.monotonic() - started
+
+
+def report(mode, samples, elapsed):
+    print(f"{mode}: {len(samples) / elapsed:.1f} req/s over {elapsed:.1f}s, "
+          f"{sum(not ok for _, _, ok in samples)} errors")
+    for kind in ('text', 'url'):
+        latencies = [latency * 1000 for k, latency, _ in samples if k == kind]
+        print(f"  {kind:4}  n={len(latencies):5}  p50={percentile(latencies, 0.5):7.0f} ms  "
+              f"p99={percentile(latencies, 0.99):7.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=sorted(SERVER_COMMANDS), default=['sync', 'async'])
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers per mode')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent clients')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of load per mode')
+    parser.add_argument('--url-share', type=float, default=0.5, help='fraction of requests that are URL analyses')
+    parser.add_argument('--origin-delay', type=float, default=0.5, help='seconds the stub origin takes to answer')
+    parser.add_argument('--words', type=int, default=800, help='words per article')
+    args = parser.parse_args()
+
+    origin = start_origin(args.origin_delay, args.words)
+    origin_url = f'http://127.0.0.1:{origin.server_address[1]}'
+    for mode in args.modes:
+        port = free_port()
+        proc = start_server(mode, args.workers, port)
+        try:
+            samples, elapsed = run_load(f'http://127.0.0.1:{port}', origin_url, args.concurrency,
+                                        args.duration, args.url_share, args.words)
+        finally:
+            proc.terminate()
+            proc.wait()
+        report(mode, samples, elapsed)
+    origin.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
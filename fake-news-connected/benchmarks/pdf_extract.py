@@ -0,0 +1,150 @@
+"""Benchmark of extract_text on a long PDF against the old full read.
+
+Writes a synthetic PDF of --pages pages (--lines lines of --words-per-line
+words each) unless --pdf names an existing one, then extracts it once with
+each path in a fresh process: the old one saved the upload to a temp file
+and appended the text of every page, extract_text reads the upload stream
+and stops at the article word budget. Prints seconds, words read and the
+peak memory (growth of max RSS) of each, and checks that the new text is
+the start of the old one.
+
+    python benchmarks/pdf_extract.py --pages 500
+"""
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from Stage_1_Filtering.file_extractor import extract_text  # noqa: E402
+
+WORDS = ("government officials said the new policy would affect thousands of residents across "
+         "the region while critics argued that the measure was rushed through parliament").split()
+
+
+def old_extract_text(data):
+    """The upload handling before file_extractor: temp file, then every page's text appended."""
+    import pdfplumber
+    fd, temp_path = tempfile.mkstemp(suffix='.pdf')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    try:
+        with pdfplumber.open(temp_path) as pdf:
+            text = ""
+            for page in pdf.pages:
+                text += page.extract_text() or ""
+        return text
+    finally:
+        os.remove(temp_path)
+
+
+def write_pdf(path, pages, lines, words_per_line, seed):
+    """A plain PDF 1.4 file with one Helvetica text block per page."""
+    rnd = random.Random(seed)
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for _ in range(pages):
+        text = ['BT /F1 10 Tf 40 800 Td 14 TL']
+        for _ in range(lines):
+            text.append('(%s) \'' % ' '.join(rnd.choice(WORDS) for _ in range(words_per_line)))
+        text.append('ET')
+        stream = '\n'.join(text).encode()
+        page_id, content_id = len(objects) + 1, len(objects) + 2
+        kids.append(f'{page_id} 0 R')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> '
+                       f'/Contents {content_id} 0 R >>'.encode())
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n'.encode() + stream + b'\nendstream')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {pages} >>'.encode()
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def max_rss():
+    """Peak resident memory of this process in KiB."""
+    # VmHWM starts afresh with the new program; ru_maxrss can keep the parent's peak across exec
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(extractor, path):
+    import pdfplumber  # noqa: F401 - imported before the baseline, as in a running worker
+    with open(path, 'rb') as f:
+        data = f.read()
+    before = max_rss()
+    started = time.perf_counter()
+    if extractor == 'old':
+        text = old_extract_text(data)
+    else:
+        text = extract_text('upload.pdf', io.BytesIO(data))
+    seconds = time.perf_counter() - started
+    print(json.dumps({'seconds': seconds, 'peak_kib': max_rss() - before, 'text': text}))
+
+
+def run(extractor, path):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', extractor, path],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--lines', type=int, default=45, help='lines per page')
+    parser.add_argument('--words-per-line', type=int, default=12)
+    parser.add_argument('--pdf', help='existing PDF to extract instead of a synthetic one')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--measure', nargs=2, metavar=('EXTRACTOR', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+        return 0
+
+    path = args.pdf
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.pdf')
+        os.close(fd)
+        write_pdf(path, args.pages, args.lines, args.words_per_line, args.seed)
+    try:
+        results = {name: run(name, path) for name in ('old', 'new')}
+    finally:
+        if args.pdf is None:
+            os.remove(path)
+
+    print(args.pdf or f"synthetic {args.pages}-page PDF")
+    for name, label in (('old', 'temp file, every page'), ('new', 'extract_text, streamed')):
+        result = results[name]
+        print(f"  {label:<24} {result['seconds']:>8.2f} s {len(result['text'].split()):>9} words "
+              f"{result['peak_kib'] / 1024:>8.1f} MiB peak")
+    if not results['old']['text'].startswith(results['new']['text']):
+        print("extract_text is not the start of the old text")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
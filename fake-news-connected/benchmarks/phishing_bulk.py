@@ -0,0 +1,143 @@
+"""Benchmark of bulk phishing scoring against local stub sites and a stub WHOIS API.
+
+Starts a stub HTTP proxy that answers for every site (redir-* domains
+redirect to another domain) and a stub WHOIS API, each answering after
+--delay seconds, then scores --urls synthetic URLs spread over --domains
+registrable domains with detect_phishing_many. Prints URLs/sec, the WHOIS
+requests sent per domain, and the URLs/sec of one detect_phishing call per
+URL on a sample.
+
+    python benchmarks/phishing_bulk.py --urls 10000 --domains 1500 --workers 16
+"""
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import urlworkxml  # noqa: E402
+from caching.ttl_cache import TieredCache  # noqa: E402
+
+TLDS = ['com', 'org', 'co.uk', 'tk', 'xyz', 'net', 'info']
+SUBDOMAINS = ['', 'www.', 'secure-login.', 'a.b.c.']
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        if urlsplit(self.path).hostname.startswith(('redir-', 'www.redir-')):
+            self.send_response(302)
+            self.send_header('Location', 'http://landing.phish-target.tk/welcome')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'x' * 20000
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class WhoisHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        domain = parse_qs(urlsplit(self.path).query)['domainName'][0]
+        self.server.lookups[domain] += 1
+        old = sum(map(ord, domain)) % 2
+        body = json.dumps({'WhoisRecord': {
+            'domainName': domain, 'registrarName': 'Example Registrar',
+            'createdDate': '2015-01-01T00:00:00Z' if old else '2025-09-01T00:00:00Z',
+            'expiresDate': '2030-01-01T00:00:00Z', 'status': 'ok',
+            'nameServers': {'hostNames': ['ns1.cloudflare.com'] if old else ['ns1.afraid.org']},
+        }}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(handler, delay):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.lookups = collections.Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def synthetic_urls(count, domains, rnd):
+    keywords = sorted(urlworkxml.SUSPICIOUS_KEYWORDS)
+    names = []
+    for i in range(domains):
+        prefix = rnd.choice(['', 'redir-']) if i % 4 == 0 else ''
+        name = rnd.choice(keywords) if i % 3 == 0 else 'site'
+        names.append(f"{prefix}{name}{i}.{rnd.choice(TLDS)}")
+    return [
+        f"http://{rnd.choice(SUBDOMAINS)}{rnd.choice(names)}/{rnd.choice(keywords + ['news', 'item'])}/{rnd.randint(0, 40)}"
+        for _ in range(count)
+    ]
+
+
+def reset_cache():
+    urlworkxml.whois_cache = TieredCache(100000, None, table='whois')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=10000)
+    parser.add_argument('--domains', type=int, default=1500, help='registrable domains the URLs are drawn from')
+    parser.add_argument('--workers', type=int, default=urlworkxml.PHISHING_CHECK_WORKERS)
+    parser.add_argument('--delay', type=float, default=0.02, help='seconds each stub takes to answer')
+    parser.add_argument('--sample', type=int, default=300, help='URLs scored one by one for comparison')
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    origin = start_server(OriginHandler, args.delay)
+    whois = start_server(WhoisHandler, args.delay)
+    # Every site name resolves to the stub origin; the WHOIS stub is reached directly
+    os.environ['http_proxy'] = f'http://127.0.0.1:{origin.server_port}'
+    os.environ['no_proxy'] = '127.0.0.1'
+    urlworkxml.WHOISXML_API_URL = f'http://127.0.0.1:{whois.server_port}/whois'
+    urls = synthetic_urls(args.urls, args.domains, random.Random(args.seed))
+
+    reset_cache()
+    sample = urls[:args.sample]
+    started = time.perf_counter()
+    single = [urlworkxml.detect_phishing(url) for url in sample]
+    single_rate = len(sample) / (time.perf_counter() - started)
+
+    reset_cache()
+    whois.lookups.clear()
+    started = time.perf_counter()
+    results = urlworkxml.detect_phishing_many(urls, args.workers)
+    elapsed = time.perf_counter() - started
+    domains = len({result['domain'] for result in results})
+    print(f"detect_phishing       {single_rate:>8.1f} URLs/s ({len(sample)} URLs)")
+    print(f"detect_phishing_many  {len(urls) / elapsed:>8.1f} URLs/s ({len(urls)} URLs, {args.workers} workers)")
+    print(f"WHOIS requests        {sum(whois.lookups.values())} for {domains} domains, "
+          f"at most {max(whois.lookups.values())} per domain")
+    origin.shutdown()
+    whois.shutdown()
+    if results[:len(sample)] != single:
+        print("detect_phishing_many differs from detect_phishing on the sample")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
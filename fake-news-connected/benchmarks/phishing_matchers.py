@@ -0,0 +1,127 @@
+"""Micro-benchmark of the phishing heuristics' keyword, provider and extension checks.
+
+Generates synthetic URLs (keywords in subdomains, paths and queries, some
+suspicious TLDs) and name-server lists (a share drawn from the suspicious
+providers), then runs each matching step with the old loops over the sets,
+reproduced inline below, and with KEYWORD_MATCHER, DNS_PROVIDER_MATCHER and
+suspicious_extension. Checks both give the same answers and prints the CPU
+seconds of each step.
+
+    python benchmarks/phishing_matchers.py --urls 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from urlworkxml import (DNS_PROVIDER_MATCHER, KEYWORD_MATCHER, SUSPICIOUS_DNS_PROVIDERS,  # noqa: E402
+                        SUSPICIOUS_EXTENSIONS, SUSPICIOUS_KEYWORDS, suspicious_extension)
+
+WORDS = "news world article story report video live sport home index page item ref media post blog daily tech".split()
+NAME_SERVERS = ["cloudflare.com", "awsdns-12.org", "google.com", "akam.net"]
+
+
+def old_keywords(path, query):
+    hits = []
+    for keyword in SUSPICIOUS_KEYWORDS:
+        if keyword in path:
+            hits.append(keyword)
+        if keyword in query:
+            hits.append(keyword)
+    return hits
+
+
+def new_keywords(path, query):
+    in_path = KEYWORD_MATCHER.find_all(path)
+    in_query = KEYWORD_MATCHER.find_all(query)
+    return [keyword for keyword in KEYWORD_MATCHER.ordered(in_path | in_query)
+            for found in (in_path, in_query) if keyword in found]
+
+
+def old_subdomain(subdomain):
+    for keyword in SUSPICIOUS_KEYWORDS:
+        if keyword in subdomain:
+            return keyword
+    return None
+
+
+def old_name_servers(name_servers):
+    return any(any(provider in ns for provider in SUSPICIOUS_DNS_PROVIDERS) for ns in name_servers)
+
+
+def new_name_servers(name_servers):
+    return any(DNS_PROVIDER_MATCHER.search(ns) for ns in name_servers)
+
+
+def old_extension(domain):
+    for extension in SUSPICIOUS_EXTENSIONS:
+        if domain.endswith(extension):
+            return extension
+    return None
+
+
+class Generator:
+    def __init__(self, seed):
+        self.rnd = random.Random(seed)
+        self.keywords = sorted(SUSPICIOUS_KEYWORDS)
+        self.providers = sorted(SUSPICIOUS_DNS_PROVIDERS)
+        self.tlds = ["com", "org", "net", "co.uk", "de", "io"] * 6 + sorted(e[1:] for e in SUSPICIOUS_EXTENSIONS)
+
+    def word(self, keyword_share=0.12):
+        rnd = self.rnd
+        return rnd.choice(self.keywords) if rnd.random() < keyword_share else rnd.choice(WORDS)
+
+    def url_parts(self):
+        """(subdomain, domain, path, query) of one URL, lower-cased as the heuristics see them."""
+        rnd = self.rnd
+        subdomain = rnd.choice(["", "www", "-".join(self.word(0.3) for _ in range(rnd.randint(1, 4)))])
+        domain = self.word(0.1) + rnd.choice(["", "-" + self.word(0.2)]) + "." + rnd.choice(self.tlds)
+        path = "/" + "/".join(self.word() for _ in range(rnd.randint(0, 5))) + rnd.choice(["", ".html", ".php"])
+        query = "&".join(f"{self.word(0.05)}={self.word(0.1)}{rnd.randint(0, 9999)}" for _ in range(rnd.randint(0, 4)))
+        return subdomain, domain, path, query
+
+    def name_servers(self):
+        rnd = self.rnd
+        return [f"ns{i}." + (rnd.choice(self.providers) if rnd.random() < 0.15 else rnd.choice(NAME_SERVERS))
+                for i in range(rnd.randint(0, 4))]
+
+
+def cpu_seconds(fn, items):
+    started = time.process_time()
+    results = [fn(*item) for item in items]
+    return time.process_time() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=1000000, help='synthetic URLs and name-server lists')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    generator = Generator(args.seed)
+    parts = [generator.url_parts() for _ in range(args.urls)]
+    steps = [
+        ('path + query keywords', old_keywords, new_keywords, [(path, query) for _, _, path, query in parts]),
+        ('subdomain keyword', old_subdomain, KEYWORD_MATCHER.first, [(subdomain,) for subdomain, _, _, _ in parts]),
+        ('name servers', old_name_servers, new_name_servers,
+         [(generator.name_servers(),) for _ in range(args.urls)]),
+        ('extension', old_extension, suspicious_extension, [(domain,) for _, domain, _, _ in parts]),
+    ]
+    failed = False
+    print(f"{'matching step':<22} {'old s':>8} {'new s':>8} {'speedup':>8}")
+    for label, old, new, items in steps:
+        old_seconds, old_results = cpu_seconds(old, items)
+        new_seconds, new_results = cpu_seconds(new, items)
+        print(f"{label:<22} {old_seconds:>8.2f} {new_seconds:>8.2f} {old_seconds / new_seconds:>7.1f}x")
+        if old_results != new_results:
+            print(f"{label}: results differ from the old loops")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Micro-benchmark of the per-stage timing that feeds /metrics.
+
+Times StageTimer.mark, StageMetrics.observe, the timing of one request as
+the pipeline does it (a timer, four marked stages and record, which also
+observes the total) and render() of a scrape. Compares the per-request cost
+with Stage1Pipeline.analyze_text on an article of --words words, with the
+metrics recorded as usual.
+
+    python benchmarks/stage_metrics.py --number 100000
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from time import perf_counter
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from Stage_1_Filtering.stage_metrics import StageMetrics, StageTimer  # noqa: E402
+
+WORDS = ("government officials said the new policy would affect thousands of residents across "
+         "the region while critics argued that the measure was rushed through parliament").split()
+STAGES = ('fetch', 'domain_check', 'authenticity', 'preprocess')
+
+
+def timed_request(metrics):
+    timer = StageTimer()
+    for stage in STAGES:
+        timer.mark(stage, perf_counter())
+    metrics.record(timer, 'url', {'ready_for_stage2': True})
+
+
+def microseconds(statement, number, repeat=5):
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=100000, help='calls per timing, best of 5 reported')
+    parser.add_argument('--words', type=int, default=800, help='words of the article analyzed for comparison')
+    args = parser.parse_args()
+
+    metrics = StageMetrics()
+    timer = StageTimer()
+    started = perf_counter()
+    mark = microseconds(lambda: timer.mark('fetch', started), args.number)
+    timer.stages.clear()
+    observe = microseconds(lambda: metrics.observe('preprocess', 'text', 'PASS', 0.003), args.number)
+    request = microseconds(lambda: timed_request(metrics), args.number)
+    render = microseconds(metrics.render, max(1, args.number // 1000))
+
+    from Stage_1_Filtering.pipeline import Stage1Pipeline
+    pipeline = Stage1Pipeline()
+    rnd = random.Random(0)
+    text = ' '.join(rnd.choice(WORDS) for _ in range(args.words)) + '.'
+    analyze = microseconds(lambda: pipeline.analyze_text(text, 'Title'), 20, repeat=3)
+
+    print(f"StageTimer.mark                      {mark:>10.2f} us")
+    print(f"StageMetrics.observe                 {observe:>10.2f} us")
+    print(f"one request (4 stages + total)       {request:>10.2f} us")
+    print(f"render() of a scrape                 {render:>10.2f} us")
+    print(f"{f'analyze_text, {args.words} words':<36} {analyze:>10.0f} us "
+          f"(timing is {request / analyze * 100:.2f}% of it)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
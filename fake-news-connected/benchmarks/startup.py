@@ -0,0 +1,108 @@
+"""Startup cost of the app: import times and gunicorn worker start, checked to stay offline.
+
+Runs `python -X importtime -c "import app"` and reports the cumulative
+import time of the app and its heavy dependencies (median of --runs), and
+whether the lazily imported file parsers stayed unimported. Then starts
+gunicorn with one worker --runs times, times spawn to the first 200 on /,
+and lists every connection the master or worker tried to open to a host
+other than this one (an audit hook on socket connects and name lookups).
+Worker startup must not touch the network, so the expected list is empty.
+
+    python benchmarks/startup.py --runs 7
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ['app', 'Stage_1_Filtering.pipeline', 'Stage_1_Filtering.preprocessor', 'nltk', 'pandas',
+           'pdfplumber', 'docx']
+
+# Runs gunicorn with an audit hook that reports non-local connections and lookups
+GUNICORN_WITH_AUDIT = r'''
+import sys
+
+LOCAL = ('127.0.0.1', '::1', 'localhost', '0.0.0.0', '', None)
+
+def audit(event, args):
+    if event == 'socket.connect' and isinstance(args[1], tuple) and args[1][0] not in LOCAL:
+        sys.stderr.write(f'OUTBOUND connect {args[1]}\n')
+    elif event == 'socket.getaddrinfo' and args[0] not in LOCAL:
+        sys.stderr.write(f'OUTBOUND lookup {args[0]}\n')
+
+sys.addaudithook(audit)
+from gunicorn.app.wsgiapp import run
+sys.argv[0] = 'gunicorn'
+run()
+'''
+
+
+def import_times():
+    """{module: cumulative import ms} of one `import app` in a fresh interpreter."""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=PROJECT_DIR,
+                            check=True, capture_output=True, text=True).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def worker_start(log):
+    """Seconds from spawning gunicorn (one worker) to the first answer on /."""
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', GUNICORN_WITH_AUDIT, '-w', '1', '-b', f'127.0.0.1:{port}'],
+                            cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, stderr=log)
+    try:
+        deadline = time.time() + 120
+        while time.time() < deadline:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5).read()
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError('gunicorn did not start')
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    print("python -X importtime -c 'import app', cumulative, median:")
+    for module in MODULES:
+        times = [run[module] for run in runs if module in run]
+        print(f"  {module:<32} {f'{statistics.median(times):.0f} ms' if times else 'not imported'}")
+
+    with tempfile.TemporaryFile('w+') as log:
+        starts = [worker_start(log) for _ in range(args.runs)]
+        log.seek(0)
+        outbound = sorted({line.strip() for line in log if line.startswith('OUTBOUND')})
+    print(f"gunicorn, 1 worker, spawn to first 200 on /: median {statistics.median(starts) * 1000:.0f} ms "
+          f"(min {min(starts) * 1000:.0f}, max {max(starts) * 1000:.0f})")
+    print(f"network access during startup: {', '.join(outbound) if outbound else 'none'}")
+    return 1 if outbound else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
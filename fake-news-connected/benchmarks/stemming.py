@@ -0,0 +1,68 @@
+"""Micro-benchmark of Porter stemming with and without the shared stem cache.
+
+Draws a synthetic Zipfian token stream (weight 1/rank over a generated
+vocabulary of inflected words), stems it with a bare PorterStemmer and with
+cached_stem, checks both give the same stems and prints tokens/sec and the
+cache statistics from stem_cache_info().
+
+    python benchmarks/stemming.py --tokens 1000000 --vocabulary 30000
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from nltk.stem import PorterStemmer  # noqa: E402
+
+from Stage_1_Filtering.preprocessor import cached_stem, stem_cache_info  # noqa: E402
+
+SUFFIXES = ['', 's', 'ed', 'ing', 'er', 'ly', 'ness', 'ation', 'ations', 'ment', 'ful', 'ize']
+
+
+def vocabulary(size, rnd):
+    words = set()
+    while len(words) < size:
+        stem = ''.join(rnd.choice('bcdfghklmnprstvw') + rnd.choice('aeiou') for _ in range(rnd.randint(2, 4)))
+        words.add(stem + rnd.choice(SUFFIXES))
+    return sorted(words, key=lambda word: rnd.random())
+
+
+def zipf_tokens(words, count, rnd):
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    return rnd.choices(words, cum_weights=cum_weights, k=count)
+
+
+def tokens_per_second(stem, tokens):
+    started = time.perf_counter()
+    stems = [stem(token) for token in tokens]
+    return len(tokens) / (time.perf_counter() - started), stems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=1000000, help='tokens stemmed per mode')
+    parser.add_argument('--vocabulary', type=int, default=30000, help='distinct words')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    tokens = zipf_tokens(vocabulary(args.vocabulary, rnd), args.tokens, rnd)
+    uncached_rate, uncached_stems = tokens_per_second(PorterStemmer().stem, tokens)
+    cached_rate, cached_stems = tokens_per_second(cached_stem, tokens)
+    print(f"uncached  {uncached_rate:>12,.0f} tokens/s")
+    print(f"cached    {cached_rate:>12,.0f} tokens/s")
+    info = stem_cache_info()
+    print(f"cache     hit rate {info['hit_rate']:.1%}, {info['size']:,} of {info['maxsize']:,} entries")
+    if uncached_stems != cached_stems:
+        print("cached stems differ from the uncached stemmer")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Micro-benchmark of fast_tokenize against NLTK's word_tokenize.
+
+Builds synthetic articles from news sentences with abbreviations, initials,
+numbers, dot runs and dashes, passes them through clean_text and lower()
+as tokenize_clean does, and tokenizes each with both functions. Prints
+words/sec for each and the number of articles where the token lists differ.
+
+    python benchmarks/tokenizer.py --articles 200 --words 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from nltk.tokenize import word_tokenize  # noqa: E402
+
+from Stage_1_Filtering.preprocessor import NewsPreprocessor, fast_tokenize  # noqa: E402
+
+SENTENCES = [
+    "WASHINGTON (Reuters) - The U.S. Senate voted 52-48 on Tuesday to approve a $1.2 trillion spending bill.",
+    "Sen. John Smith, R-Texas, said the measure was \"long overdue\" and officials at the U.N. declined to comment.",
+    "Shares of Acme Corp. fell 3.5% to $42.10 at 10 a.m. after revenue of 1,250 million dollars -- below forecasts.",
+    "Dr. Fauci warned that cases could rise to 100,000 per day! Is that true? Experts aren't sure...",
+    "The team, led by Prof. Lee, published in Nature (vol. 12, no. 3) on Jan. 5 after months of review.",
+    "He said he's gonna win and they wanna believe him; nobody cannot argue with that.",
+    "J. R. Smith Jr. of St. Louis, Mo., told Mr. and Mrs. Jones on Sept. 3 that No. 1 was out.",
+    "Government officials said the new policy would affect thousands of residents across the region.",
+]
+
+
+def articles(count, words, rnd):
+    preprocessor = NewsPreprocessor()
+    texts = []
+    for _ in range(count):
+        sentences = []
+        while sum(len(sentence.split()) for sentence in sentences) < words:
+            sentences.append(rnd.choice(SENTENCES))
+        texts.append(preprocessor.clean_text(' '.join(sentences)).lower())
+    return texts
+
+
+def words_per_second(tokenize, texts, repeats):
+    words = sum(len(text.split()) for text in texts)
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for text in texts:
+            tokenize(text)
+        best = min(best, time.perf_counter() - started)
+    return words / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=200)
+    parser.add_argument('--words', type=int, default=1000, help='words per article')
+    parser.add_argument('--repeats', type=int, default=3, help='runs per tokenizer, best one reported')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    texts = articles(args.articles, args.words, random.Random(args.seed))
+    for name, tokenize in (('word_tokenize', word_tokenize), ('fast_tokenize', fast_tokenize)):
+        print(f"{name:<14} {words_per_second(tokenize, texts, args.repeats):>12,.0f} words/s")
+    mismatches = sum(fast_tokenize(text) != word_tokenize(text) for text in texts)
+    print(f"articles where the tokens differ: {mismatches} of {len(texts)}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
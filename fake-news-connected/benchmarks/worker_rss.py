@@ -0,0 +1,114 @@
+"""Memory per gunicorn worker of the sync app, with and without preload_app.
+
+Starts gunicorn with each --workers count twice: once with gunicorn.conf.py
+(the app is built in the master and forked workers share it) and once with
+preload_app off, so every worker builds its own pipeline as before the app
+factory. After --requests text analyses per worker it reads
+/proc/<pid>/smaps_rollup of the master and every worker and prints RSS and
+private memory (Private_Clean + Private_Dirty) per worker, and the PSS of
+all processes together. Linux only.
+
+    python benchmarks/worker_rss.py --workers 4 16 32 --requests 20
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = ("government officials said the new policy would affect thousands of residents across "
+         "the region while critics argued that the measure was rushed through parliament").split()
+
+# Loaded instead of gunicorn.conf.py for the per-worker mode
+NO_PRELOAD_CONFIG = 'wsgi_app = "app:app"\npreload_app = False\n'
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def smaps_rollup(pid):
+    """{field: KiB} from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields
+
+
+def worker_pids(master):
+    with open(f'/proc/{master}/task/{master}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def analyze(port, seed):
+    rnd = random.Random(seed)
+    content = ' '.join(rnd.choice(WORDS) for _ in range(400)) + '.'
+    data = urllib.parse.urlencode({'input_type': 'text', 'content': content, 'title': f'Story {seed}'}).encode()
+    urllib.request.urlopen(f'http://127.0.0.1:{port}/analyze', data, timeout=60).read()
+
+
+def answers(port):
+    try:
+        urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5).read()
+        return True
+    except OSError:
+        return False
+
+
+def measure(workers, requests, config):
+    port = free_port()
+    command = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}', '--timeout', '120']
+    if config:
+        command += ['-c', config]
+    proc = subprocess.Popen(command, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 300
+        while len(worker_pids(proc.pid)) < workers or not answers(port):
+            if time.time() > deadline:
+                raise RuntimeError('gunicorn did not start')
+            time.sleep(0.2)
+        for seed in range(workers * requests):
+            analyze(port, seed)
+        pids = worker_pids(proc.pid)
+        per_worker = [smaps_rollup(pid) for pid in pids]
+        master = smaps_rollup(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+    rss = sum(m['Rss'] for m in per_worker) / len(per_worker)
+    private = sum(m['Private_Clean'] + m['Private_Dirty'] for m in per_worker) / len(per_worker)
+    total_pss = master['Pss'] + sum(m['Pss'] for m in per_worker)
+    return rss / 1024, private / 1024, total_pss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', nargs='+', type=int, default=[4, 16, 32])
+    parser.add_argument('--requests', type=int, default=20, help='text analyses per worker before measuring')
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.py') as no_preload:
+        no_preload.write(NO_PRELOAD_CONFIG)
+        no_preload.flush()
+        print(f"{'mode':<12} {'workers':>7} {'RSS/worker MB':>14} {'private/worker MB':>18} {'total PSS MB':>13}")
+        for mode, config in (('per worker', no_preload.name), ('preload', None)):
+            for workers in args.workers:
+                rss, private, total_pss = measure(workers, args.requests, config)
+                print(f"{mode:<12} {workers:>7} {rss:>14.1f} {private:>18.1f} {total_pss:>13.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
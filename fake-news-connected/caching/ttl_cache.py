@@ -0,0 +1,168 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+# Default seconds between deletions of expired rows from a SQLiteCache
+PURGE_INTERVAL = 10 * 60
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache whose entries expire after a per-entry TTL."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (value, expires_at), or None if key is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, ttl=None, expires_at=None):
+        if expires_at is None:
+            expires_at = time.time() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _json_default(value):
+    # Dict-like records (such as the pipeline's ArticleRecord) are stored as objects
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class SQLiteCache:
+    """JSON values with an expiry time in a SQLite table shared by every worker process.
+
+    Expired rows are never read, and every purge_interval seconds a set()
+    deletes them so the file does not grow with every key ever stored
+    (None = only when purge_expired is called).
+    """
+
+    def __init__(self, path, table="cache", purge_interval=PURGE_INTERVAL):
+        self.path = path
+        self.table = table
+        self.purge_interval = purge_interval
+        self._next_purge = time.monotonic() + (purge_interval or 0)
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread, and never one inherited across a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        """Return (value, expires_at), or None if key is missing or expired."""
+        row = self._connection().execute(
+            f"SELECT value, expires_at FROM {self.table} WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, ttl=None, expires_at=None):
+        if expires_at is None:
+            expires_at = time.time() + ttl
+        self._connection().execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, default=_json_default), expires_at),
+        )
+        if self.purge_interval and time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + self.purge_interval
+            self.purge_expired()
+
+    def purge_expired(self):
+        self._connection().execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+
+
+class TieredCache:
+    """In-memory TTLCache in front of an optional shared SQLiteCache, with hit/miss counters.
+
+    Failures of the shared store are counted and otherwise ignored; the cache
+    must never turn into a reason for a request to fail. Request threads share
+    one instance, so the counters are only updated under a lock.
+    """
+
+    def __init__(self, maxsize, path=None, table="cache", purge_interval=PURGE_INTERVAL):
+        self.memory = TTLCache(maxsize)
+        self.store = SQLiteCache(path, table, purge_interval) if path else None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.store_errors = 0
+        self._counter_lock = threading.Lock()
+
+    def _count(self, counter):
+        # += on an attribute is a read then a write; two threads can lose an update
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._count('hits')
+            return entry[0]
+        if self.store is not None:
+            try:
+                entry = self.store.get(key)
+            except sqlite3.Error:
+                self._count('store_errors')
+                entry = None
+            if entry is not None:
+                self._count('shared_hits')
+                self.memory.set(key, entry[0], expires_at=entry[1])
+                return entry[0]
+        self._count('misses')
+        return None
+
+    def set(self, key, value, ttl):
+        expires_at = time.time() + ttl
+        self.memory.set(key, value, expires_at=expires_at)
+        if self.store is not None:
+            try:
+                self.store.set(key, value, expires_at=expires_at)
+            except (sqlite3.Error, TypeError, ValueError):
+                self._count('store_errors')
+
+    def stats(self):
+        # Read together, so hit_rate matches the counts next to it
+        with self._counter_lock:
+            hits, shared_hits, misses, store_errors = self.hits, self.shared_hits, self.misses, self.store_errors
+        lookups = hits + shared_hits + misses
+        return {
+            'size': len(self.memory),
+            'maxsize': self.memory.maxsize,
+            'hits': hits,
+            'shared_hits': shared_hits,
+            'misses': misses,
+            'hit_rate': (hits + shared_hits) / lookups if lookups else 0.0,
+            'store_errors': store_errors,
+        }
@@ -9,10 +9,91 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 DOMAIN_QUALITY_DB_PATH = os.path.join(BASE_DIR, "data", "domain_pc1.csv")
 DOMAIN_RATINGS_PATH = os.path.join(BASE_DIR, "data", "domain_ratings.csv")
 
+# Compiled snapshot of both CSVs (python -m domain_quality.snapshot); optional
+DOMAIN_SNAPSHOT_PATH = os.path.join(BASE_DIR, "data", "domain_quality.snap")
+
+# Seconds between checks for new rating files or a rebuilt snapshot; a change is
+# loaded in the background and swapped in without a restart (0 = never reload)
+RATINGS_RELOAD_INTERVAL = 30
+
 # Preprocessing settings
 MIN_ARTICLE_LENGTH = 50
 MAX_ARTICLE_LENGTH = 10000
 
+# Stemmer cache: distinct words kept per process, and an optional vocabulary file
+# (one word per line) used to pre-warm it at startup
+STEM_CACHE_SIZE = 50000
+STEM_VOCABULARY_PATH = None
+
+# NLTK data directory bundled with the app (python -m Stage_1_Filtering.nltk_resources
+# fills it before the server starts, see Procfile.txt), whether a worker may download
+# missing data into it on first use (off, so workers start without network access),
+# and the frozen English stopword list
+NLTK_DATA_PATH = os.path.join(BASE_DIR, "data", "nltk_data")
+NLTK_AUTO_DOWNLOAD = False
+STOPWORDS_PATH = os.path.join(BASE_DIR, "data", "stopwords_english.txt")
+
+# Tokenizer: 'nltk' (word_tokenize) or 'fast' (single regex scan, same filtered tokens
+# for English news without running the Punkt sentence splitter)
+TOKENIZER_MODE = 'nltk'
+
+# Maximum number of items accepted by /analyze/batch
+MAX_BATCH_SIZE = 1000
+
+# Offline scoring (python -m Stage_1_Filtering.bulk_score): articles per work unit
+# and work units queued per worker process
+BULK_CHUNK_SIZE = 200
+BULK_CHUNKS_PER_WORKER = 2
+
+# Stage 1 result cache: entries kept in memory per worker, optional SQLite file to
+# share results between workers (None = per-worker only), freshness (seconds) of
+# text and URL results, and seconds between deletions of expired rows from the file
+RESULT_CACHE_SIZE = 5000
+RESULT_CACHE_PATH = None
+RESULT_CACHE_TEXT_TTL = 24 * 3600
+RESULT_CACHE_URL_TTL = 10 * 60
+RESULT_CACHE_PURGE_INTERVAL = 10 * 60
+
+# URL fetching: per-connection timeout and overall deadline (seconds) per fetch call,
+# worker threads per process and concurrent requests allowed against a single host
+FETCH_TIMEOUT = 10
+FETCH_DEADLINE = 15
+FETCH_MAX_WORKERS = 32
+FETCH_PER_HOST_LIMIT = 4
+
+# Largest page body (bytes, after decompression) a fetch will download; bigger pages
+# are abandoned as soon as they pass it. None downloads everything
+FETCH_MAX_BYTES = 4 * 1024 * 1024
+
+# Async serving mode (asgi.py): processes per server worker that parse, score and
+# preprocess articles off the event loop
+ASYNC_CPU_WORKERS = os.cpu_count() or 1
+
+# Parsing of uploaded PDF/DOCX files: processes per server worker, jobs allowed to
+# wait for a free process before uploads are turned away (HTTP 429), CPU seconds a
+# single document may use, and how long (seconds) a request waits for its text
+PARSE_POOL_WORKERS = 2
+PARSE_QUEUE_DEPTH = 4
+PARSE_CPU_LIMIT = 20
+PARSE_TIMEOUT = 30
+
+# Stage latency metrics (/metrics): processes that can report into the shared
+# histograms, counting server workers and the pool processes forked from them
+METRICS_MAX_PROCESSES = 64
+
 # WHOISXML API key (optional, for urlworkxml.py)
 
 WHOISXML_API_KEY = ""
+WHOISXML_API_URL = "https://www.whoisxmlapi.com/whoisserver/WhoisService"
+WHOIS_TIMEOUT = 10
+
+# WHOIS cache: entries kept in memory per worker, SQLite file shared by all workers,
+# and how long (seconds) successful and failed lookups stay cached
+WHOIS_CACHE_SIZE = 10000
+WHOIS_CACHE_PATH = os.path.join(BASE_DIR, "data", "whois_cache.sqlite3")
+WHOIS_CACHE_TTL = 3 * 24 * 3600
+WHOIS_NEGATIVE_TTL = 10 * 60
+
+# Bulk phishing checks (urlworkxml.detect_phishing_many): threads running WHOIS
+# lookups and redirect checks at once
+PHISHING_CHECK_WORKERS = 16
@@ -1,5 +1,12 @@
+import hashlib
+import io
 import os
-import pandas as pd
+import threading
+import time
+import numpy as np
+from config.settings import DOMAIN_RATINGS_PATH, DOMAIN_SNAPSHOT_PATH, RATINGS_RELOAD_INTERVAL
+from domain_quality.ratings_store import RATER_COLUMNS, RatingsStore
+from domain_quality.snapshot import FLAG_INHERITABLE, file_stat, is_inheritable, load_snapshot
 
 RESEARCH_REFERENCE = (
     "Lin, H.; Lasser, J.; Lewandowsky, S.; Cole, R.; Gully, A.; Rand, D.G.; Pennycook, G. "
@@ -7,8 +14,108 @@ RESEARCH_REFERENCE = (
     "PNAS Nexus, 2(9), pgad286."
 )
 
+# Trie node key holding the score of the domain that ends at that node
+_SCORE = None
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def ratings_version(source_hashes):
+    """Short id of a ratings release, from the sha1 of each of its source files."""
+    return hashlib.sha1(b"".join(source_hashes)).hexdigest()[:12]
+
+class RatingsRelease:
+    """One loaded version of the rating files and the lookup structures built from it.
+
+    A release is never modified once built; reloading builds a new one and
+    swaps it in, so a lookup that holds a release sees a consistent dataset.
+    """
+
+    def __init__(self, index, suffix_trie, ratings, version, df=None, snapshot=None):
+        self.index = index
+        self.suffix_trie = suffix_trie
+        self.ratings = ratings
+        self.version = version
+        self.df = df
+        # A mapped DomainSnapshot replaces index and suffix_trie: lookups bisect its table
+        self.snapshot = snapshot
+        self.pc1 = snapshot.column('pc1') if snapshot is not None else None
+
+    def lookup_score(self, domain):
+        """Return the pc1 score for a normalized domain, or None if it is not rated."""
+        if self.index is not None:
+            return self.index.get(domain)
+        if self.snapshot is not None:
+            return self._snapshot_score(self.snapshot.find(domain))
+        result = self.df[self.df['domain'] == domain]
+        if result.empty:
+            return None
+        return float(result['pc1'].iloc[0])
+
+    def _snapshot_score(self, row):
+        if row is None:
+            return None
+        score = float(self.pc1[row])
+        return None if score != score else score
+
+    def match(self, domain):
+        """Return (matched_domain, score): domain itself if rated, else its longest rated parent.
+
+        (None, None) if neither is rated.
+        """
+        score = self.lookup_score(domain)
+        if score is not None:
+            return domain, score
+        return self.lookup_suffix(domain)
+
+    def lookup_suffix(self, domain):
+        """Return (matched_domain, score) for the longest rated parent of domain.
+
+        edition.cnn.com matches cnn.com in a single walk down the suffix trie, or
+        with one bisect of the snapshot per parent, longest first.
+        """
+        labels = domain.split('.')
+        best_depth, best_score = 0, None
+        if self.suffix_trie is not None:
+            node = self.suffix_trie
+            for depth, label in enumerate(reversed(labels), 1):
+                node = node.get(label)
+                if node is None:
+                    break
+                if _SCORE in node:
+                    best_depth, best_score = depth, node[_SCORE]
+        elif self.snapshot is not None:
+            # The same hosts as in the trie: rated, and flagged inheritable at build time
+            for depth in range(len(labels), 0, -1):
+                row = self.snapshot.find('.'.join(labels[-depth:]))
+                if row is None or not self.snapshot.flags[row] & FLAG_INHERITABLE:
+                    continue
+                score = self._snapshot_score(row)
+                if score is not None:
+                    best_depth, best_score = depth, score
+                    break
+        else:
+            for depth in range(len(labels) - 1, 0, -1):
+                candidate = '.'.join(labels[-depth:])
+                score = self.lookup_score(candidate)
+                if score is not None and is_inheritable(candidate):
+                    best_depth, best_score = depth, score
+                    break
+        if best_score is None:
+            return None, None
+        return '.'.join(labels[-best_depth:]), best_score
+
 class DomainQualityDB:
-    def __init__(self, db_path=None):
+    """Domain ratings lookups over the current RatingsRelease.
+
+    Every reload_interval seconds a lookup checks whether the rating files or
+    the snapshot changed on disk; if so a background thread loads the new
+    release while lookups keep using the current one, then swaps it in.
+    """
+
+    def __init__(self, db_path=None, use_index=True, ratings_path=DOMAIN_RATINGS_PATH,
+                 snapshot_path=DOMAIN_SNAPSHOT_PATH, reload_interval=RATINGS_RELOAD_INTERVAL):
         if db_path is None:
             # Adjust base_dir if needed based on your project structure
             base_dir = os.path.abspath(os.path.dirname(__file__))
@@ -16,17 +123,153 @@ class DomainQualityDB:
         if not os.path.exists(db_path):
             raise FileNotFoundError(f"Domain quality DB file not found at {db_path}")
 
+        self.db_path = db_path
+        self.ratings_path = ratings_path
+        self.snapshot_path = snapshot_path
+        self.use_index = use_index
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._next_check = time.monotonic() + (reload_interval or 0)
+        self._stamp = self._source_stamp()
+        self.release = self.load_release()
+
+    @property
+    def version(self):
+        return self.release.version
+
+    def current_version(self):
+        """Version of the release in use, after checking the files like a lookup does.
+
+        For processes that need the version without doing lookups themselves,
+        such as the async server whose scoring runs in a process pool.
+        """
+        self.check_for_update()
+        return self.release.version
+
+    def load_release(self):
+        """Build a RatingsRelease from the files as they are now."""
+        # A fresh compiled snapshot avoids importing pandas and parsing the CSV per worker
+        snapshot = load_snapshot(self.snapshot_path, (self.db_path, self.ratings_path)) if self.use_index else None
+        if snapshot is not None:
+            # Nothing per domain is copied out of the mapping, so its pages stay shared between workers
+            version = ratings_version(sha1 for _, _, sha1 in snapshot.sources)
+            print(f"Mapped {snapshot.size} domains from snapshot {self.snapshot_path} (ratings {version})")
+            return RatingsRelease(None, None, RatingsStore.from_snapshot(snapshot), version, snapshot=snapshot)
+
+        # Each file is read once: the version is hashed from the same bytes that are parsed,
+        # so a file replaced during the load cannot label old data with a new version
+        db_data = _read_file(self.db_path)
         # Load CSV into pandas DataFrame for fast querying
         try:
-            self.df = pd.read_csv(db_path)
+            import pandas as pd
+            df = pd.read_csv(io.BytesIO(db_data))
             print("Dataframe successfully loaded")
-            self.df['domain'] = self.df['domain'].str.lower()
-            print(f"Loaded dataframe with {len(self.df)} rows")
+            df['domain'] = df['domain'].str.lower().str.strip()
+            print(f"Loaded dataframe with {len(df)} rows")
         except Exception as e:
             print("Error loading CSV:", e)
-            raise 
+            raise
+
+        # Hash index built once at load time; the DataFrame scan is only a fallback
+        index = self.build_index(df) if self.use_index else None
+        suffix_trie = self.build_suffix_trie(
+            (domain, score) for domain, score in index.items() if is_inheritable(domain)
+        ) if self.use_index else None
+        # Per-rater scores are optional; only pc1 is needed for the verdict
+        ratings_data = _read_file(self.ratings_path) if os.path.exists(self.ratings_path) else None
+        ratings = RatingsStore.from_csv(io.BytesIO(ratings_data)) if ratings_data is not None else None
+        version = ratings_version([
+            hashlib.sha1(db_data).digest(), hashlib.sha1(ratings_data).digest() if ratings_data is not None else b""
+        ])
+        return RatingsRelease(index, suffix_trie, ratings, version, df)
+
+    def _source_stamp(self):
+        stamp = []
+        for path in (self.db_path, self.ratings_path, self.snapshot_path):
+            try:
+                stamp.append(file_stat(path) if path else None)
+            except OSError:
+                stamp.append(None)
+        return stamp
+
+    def reload(self):
+        """Load the rating files again and swap the new release in; returns its version.
+
+        Lookups keep using the previous release until the new one is complete.
+        """
+        with self._reload_lock:
+            # Taken before loading, so a change made while loading is picked up next time
+            stamp = self._source_stamp()
+            release = self.load_release()
+            self.release = release
+            self._stamp = stamp
+        return release.version
+
+    def check_for_update(self):
+        """Start a background reload if the files changed; checks at most once per reload_interval."""
+        if not self.reload_interval:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+        if self._reload_lock.locked() or self._source_stamp() == self._stamp:
+            return
+        threading.Thread(target=self._reload_in_background, name="ratings-reload", daemon=True).start()
+
+    def _reload_in_background(self):
+        try:
+            self.reload()
+        except Exception as e:
+            # A half-copied file fails to load; its final write triggers another reload
+            print("Keeping current domain ratings, reload failed:", e)
+
+    @staticmethod
+    def build_index(df):
+        """Map each normalized domain to its pc1 score."""
+        return dict(zip(df['domain'].tolist(), df['pc1'].astype(float).tolist()))
+
+    @staticmethod
+    def build_suffix_trie(entries):
+        """Build a reverse-label trie (com -> cnn -> edition) over (domain, score) pairs.
+
+        Only pass hosts whose rating subdomains may inherit (see is_inheritable),
+        so a rating never crosses a public suffix such as blogspot.com.
+        """
+        trie = {}
+        for domain, score in entries:
+            node = trie
+            for label in reversed(domain.split('.')):
+                node = node.setdefault(label, {})
+            node[_SCORE] = score
+        return trie
+
+    def lookup_score(self, domain):
+        """Return the pc1 score for a normalized domain, or None if it is not rated."""
+        return self.release.lookup_score(domain)
+
+    def lookup_suffix(self, domain):
+        """Return (matched_domain, score) for the longest rated parent of domain."""
+        return self.release.lookup_suffix(domain)
+
+    def get_many(self, domains):
+        """Per-rater scores for many domains at once, see RatingsStore.get_many.
+
+        Like get_domain_info, a domain that is not rated itself gets the ratings of
+        the parent it inherits from (edition.cnn.com those of cnn.com). Rows are
+        all NaN when nothing matches or no ratings file was loaded.
+        """
+        self.check_for_update()
+        release = self.release
+        if release.ratings is None:
+            return np.full((len(domains), len(RATER_COLUMNS)), np.nan)
+        matched = [release.match(domain.lower().strip())[0] or '' for domain in domains]
+        return release.ratings.get_many(matched)
 
     def get_domain_info(self, domain):
+        self.check_for_update()
+        # One release for the whole lookup, even if a reload swaps it meanwhile
+        release = self.release
         domain = domain.lower().strip()
         if domain == '':
             return {
@@ -34,18 +277,23 @@ class DomainQualityDB:
                 "score": 0.5,
                 "status": "unknown",
                 "reason": "No domain provided - default unknown status",
+                "matched_domain": None,
+                "ratings": None,
+                "ratings_version": release.version,
                 "reference": RESEARCH_REFERENCE,
             }
-        result = self.df[self.df['domain'] == domain]
-        if result.empty:
+        matched_domain, score = release.match(domain)
+        if score is None:
             return {
                 "domain": domain,
                 "score": 0.5,
                 "status": "unknown",
                 "reason": "Domain not found in expert-rated dataset.",
+                "matched_domain": None,
+                "ratings": None,
+                "ratings_version": release.version,
                 "reference": RESEARCH_REFERENCE,
             }
-        score = float(result['pc1'])
         if score >= 0.8:
             status = "trusted"
             reason = "Aggregated expert ratings indicate this is a highly trusted news source."
@@ -55,10 +303,15 @@ class DomainQualityDB:
         else:
             status = "unknown"
             reason = "Domain is rated as intermediate quality."
+        if matched_domain != domain:
+            reason += f" (rating inherited from {matched_domain})"
         return {
             "domain": domain,
             "score": score,
             "status": status,
             "reason": reason,
+            "matched_domain": matched_domain,
+            "ratings": release.ratings.get(matched_domain) if release.ratings is not None else None,
+            "ratings_version": release.version,
             "reference": RESEARCH_REFERENCE,
         }
\ No newline at end of file
@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Rater columns of domain_ratings.csv (Lin et al. 2023), in file order
+RATER_COLUMNS = (
+    "pc1", "afm", "afm_bias", "afm_min", "afm_rely", "fc",
+    "mbfc", "mbfc_bias", "mbfc_fact", "mbfc_min",
+    "lewandowsky_acc", "lewandowsky_trans", "lewandowsky_rely", "lewandowsky_mean", "lewandowsky_min",
+    "misinfome_bin",
+)
+
+DomainRatings = namedtuple("DomainRatings", RATER_COLUMNS)
+
+
+class RatingsStore:
+    """Columnar per-rater scores, loaded once and queried without pandas.
+
+    values is a float64 array with one row per name in columns and one column
+    per domain, NaN where a rater has no score; a rater missing from columns
+    has no scores at all. find_row(domain) returns the column of a normalized
+    domain in values, or None. When loaded from a snapshot both are backed by
+    the mapped file: values is a read-only view and find_row bisects its
+    string table.
+    """
+
+    def __init__(self, find_row, values, columns=RATER_COLUMNS):
+        self.find_row = find_row
+        self.values = values
+        # Row of each of RATER_COLUMNS in values, or -1
+        self.sources = [columns.index(c) if c in columns else -1 for c in RATER_COLUMNS]
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        # The mapped values are used as they are, whatever columns the snapshot has
+        return cls(snapshot.find, snapshot.values, snapshot.columns)
+
+    @classmethod
+    def from_csv(cls, source):
+        """Load domain_ratings.csv from a path or a binary file object."""
+        import pandas as pd
+        df = pd.read_csv(source)
+        domains = df['domain'].str.lower().str.strip().tolist()
+        values = np.vstack([
+            df[c].to_numpy(dtype=float) if c in df.columns else np.full(len(df), np.nan)
+            for c in RATER_COLUMNS
+        ])
+        rows = {domain: i for i, domain in enumerate(domains)}
+        return cls(rows.get, values)
+
+    def get(self, domain):
+        """Return the DomainRatings of a normalized domain, or None if it is not rated."""
+        row = self.find_row(domain)
+        if row is None:
+            return None
+        scores = self.values[:, row].tolist()
+        # NaN -> None so the struct stays JSON friendly
+        return DomainRatings(*[None if i < 0 or scores[i] != scores[i] else scores[i] for i in self.sources])
+
+    def get_many(self, domains):
+        """Return a (len(domains), len(RATER_COLUMNS)) array, NaN rows for unrated domains."""
+        rows = np.fromiter(
+            (-1 if row is None else row for row in map(self.find_row, (d.lower().strip() for d in domains))),
+            dtype=np.intp, count=len(domains)
+        )
+        missing = rows < 0
+        scores = self.values[:, np.where(missing, 0, rows)]
+        result = np.full((len(domains), len(RATER_COLUMNS)), np.nan)
+        present = [i for i, source in enumerate(self.sources) if source >= 0]
+        result[:, present] = scores[[self.sources[i] for i in present]].T
+        result[missing] = np.nan
+        return result
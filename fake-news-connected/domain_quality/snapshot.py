@@ -0,0 +1,218 @@
+"""Compiled, memory-mapped snapshot of the domain rating CSVs.
+
+Build it once per deploy with ``python -m domain_quality.snapshot``. Workers map
+the file read-only and look domains up in the mapped table itself, so the
+domains and ratings are shared between processes instead of being copied into
+each one, and no CSV parsing (or pandas import) happens at startup.
+
+Layout (little endian, every section 8-byte aligned):
+
+    header      magic, domain count, column count, source count
+    sources     size, mtime_ns and sha1 of every CSV the snapshot was built from
+    columns     column names, 32 bytes each
+    offsets     uint32[n + 1] into the string table
+    strings     UTF-8 domains sorted bytewise, so lookups can bisect in place
+    flags       uint8[n], FLAG_INHERITABLE when subdomains may inherit the rating
+    values      float64[columns][n], NaN where a file has no rating
+"""
+import bisect
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+import tldextract
+
+from config.settings import DOMAIN_QUALITY_DB_PATH, DOMAIN_RATINGS_PATH, DOMAIN_SNAPSHOT_PATH
+
+MAGIC = b"DQSNAP01"
+HEADER = struct.Struct("<8sIII")
+SOURCE = struct.Struct("<Qq20s")
+COLUMN_NAME = struct.Struct("<32s")
+
+FLAG_INHERITABLE = 1
+
+# Private PSL entries (blogspot.com, altervista.org, ...) count as public suffixes so
+# that user sites hosted on them never inherit the platform's own rating.
+# suffix_list_urls=() keeps workers on the bundled list instead of fetching it.
+_suffix_extractor = tldextract.TLDExtract(include_psl_private_domains=True, suffix_list_urls=())
+
+
+def is_inheritable(domain):
+    """True if subdomains of domain may inherit its rating."""
+    # Path-scoped ratings (facebook.com/news) only ever match exactly
+    return "/" not in domain and bool(_suffix_extractor(domain).domain)
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def file_stat(path):
+    """(size, mtime_ns) of path, the cheap first check that a source file is unchanged."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def _read_ratings(path):
+    """Return ({domain: {column: value}}, [columns]) from a ratings CSV."""
+    rows = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        columns = [c for c in reader.fieldnames if c != "domain"]
+        for row in reader:
+            domain = row["domain"].lower().strip()
+            rows[domain] = {c: float(row[c]) if row[c] not in ("", None) else float("nan") for c in columns}
+    return rows, columns
+
+
+def build_snapshot(pc1_path=DOMAIN_QUALITY_DB_PATH, ratings_path=DOMAIN_RATINGS_PATH,
+                   out_path=DOMAIN_SNAPSHOT_PATH):
+    """Compile the pc1 and ratings CSVs into a snapshot file at out_path."""
+    sources = [pc1_path, ratings_path]
+    pc1_rows, _ = _read_ratings(pc1_path)
+    rating_rows, rating_columns = _read_ratings(ratings_path)
+    # pc1 always comes from the primary DB file, the rest from the ratings file
+    columns = ["pc1"] + [c for c in rating_columns if c != "pc1"]
+
+    domains = sorted(set(pc1_rows) | set(rating_rows), key=lambda d: d.encode("utf-8"))
+    encoded = [d.encode("utf-8") for d in domains]
+    offsets = np.zeros(len(domains) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+
+    flags = np.array([FLAG_INHERITABLE if is_inheritable(d) else 0 for d in domains], dtype="u1")
+
+    values = np.full((len(columns), len(domains)), np.nan, dtype="<f8")
+    for i, domain in enumerate(domains):
+        if domain in pc1_rows:
+            values[0, i] = pc1_rows[domain]["pc1"]
+        rating = rating_rows.get(domain)
+        if rating:
+            for j, column in enumerate(columns[1:], 1):
+                values[j, i] = rating[column]
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(domains), len(columns), len(sources)))
+        for path in sources:
+            size, mtime_ns = file_stat(path)
+            f.write(SOURCE.pack(size, mtime_ns, _file_sha1(path)))
+        for column in columns:
+            f.write(COLUMN_NAME.pack(column.encode("ascii")))
+        for section in (offsets.tobytes(), b"".join(encoded), flags.tobytes(), values.tobytes()):
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            f.write(section)
+    # Workers may be mapping the old file; replace it atomically
+    os.replace(tmp_path, out_path)
+    return len(domains)
+
+
+class DomainSnapshot:
+    """Read-only view over a memory-mapped snapshot file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, n_columns, n_sources = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a domain quality snapshot")
+        pos = HEADER.size
+        self.sources = []
+        for _ in range(n_sources):
+            self.sources.append(SOURCE.unpack_from(self._mm, pos))
+            pos += SOURCE.size
+        self.columns = []
+        for _ in range(n_columns):
+            self.columns.append(COLUMN_NAME.unpack_from(self._mm, pos)[0].rstrip(b"\0").decode("ascii"))
+            pos += COLUMN_NAME.size
+
+        pos = _align(pos)
+        self.offsets = np.frombuffer(self._mm, dtype="<u4", count=self.size + 1, offset=pos)
+        pos += self.offsets.nbytes
+        self._strings_start = pos = _align(pos)
+        native = self.offsets if sys.byteorder == "little" else self.offsets.astype("=u4")
+        self._domains = _DomainSequence(self._mm, pos, memoryview(native).cast("B").cast("I"))
+        pos += int(self.offsets[-1])
+        pos = _align(pos)
+        self.flags = np.frombuffer(self._mm, dtype="u1", count=self.size, offset=pos)
+        pos = _align(pos + self.size)
+        self.values = np.frombuffer(self._mm, dtype="<f8", count=n_columns * self.size,
+                                    offset=pos).reshape(n_columns, self.size)
+
+    def is_fresh(self, paths):
+        """True if the snapshot was built from the current contents of paths."""
+        if len(paths) != len(self.sources):
+            return False
+        for path, (size, mtime_ns, sha1) in zip(paths, self.sources):
+            try:
+                current_size, current_mtime_ns = file_stat(path)
+            except OSError:
+                return False
+            if current_size != size:
+                return False
+            # A touched but unchanged file (e.g. a fresh checkout) is still fresh
+            if current_mtime_ns != mtime_ns and _file_sha1(path) != sha1:
+                return False
+        return True
+
+    def domain_bytes(self, i):
+        return self._domains[i]
+
+    def find(self, domain):
+        """Return the row of domain, or None, by bisecting the mapped string table."""
+        key = domain.encode("utf-8")
+        i = bisect.bisect_left(self._domains, key)
+        if i < self.size and self._domains[i] == key:
+            return i
+        return None
+
+    def column(self, name):
+        return self.values[self.columns.index(name)]
+
+
+class _DomainSequence:
+    """Sequence adapter so bisect can search the mapped strings without decoding them."""
+
+    def __init__(self, mm, start, offsets):
+        self.mm = mm
+        self.start = start
+        # A memoryview of the offsets: indexing it gives plain ints, much cheaper than numpy scalars
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.mm[self.start + self.offsets[i]:self.start + self.offsets[i + 1]]
+
+
+def load_snapshot(path=DOMAIN_SNAPSHOT_PATH, sources=(DOMAIN_QUALITY_DB_PATH, DOMAIN_RATINGS_PATH)):
+    """Map the snapshot at path, or return None if it is missing, corrupt or stale."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        snapshot = DomainSnapshot(path)
+    except (OSError, ValueError, struct.error) as e:
+        print("Ignoring unreadable domain snapshot:", e)
+        return None
+    if not snapshot.is_fresh(list(sources)):
+        print("Domain snapshot is stale, falling back to CSV")
+        return None
+    return snapshot
+
+
+if __name__ == "__main__":
+    out = sys.argv[1] if len(sys.argv) > 1 else DOMAIN_SNAPSHOT_PATH
+    count = build_snapshot(out_path=out)
+    print(f"Wrote {count} domains to {out}")
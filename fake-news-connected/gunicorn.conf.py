@@ -0,0 +1,18 @@
+"""Gunicorn settings, read automatically when gunicorn starts in this directory.
+
+The app is created once in the master (preload_app) and workers are forked
+from it, so the domain ratings, stopwords, stemmer cache and imported modules
+are shared copy-on-write instead of being rebuilt in every worker.
+"""
+import gc
+
+wsgi_app = "app:app"
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any worker is forked.
+    # Frozen objects are skipped by the cyclic collector, so a collection in a
+    # worker does not write to them and copy the shared pages.
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,52 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+import pytest
+
+asgi = pytest.importorskip('asgi')
+
+
+def crash():
+    os._exit(1)
+
+
+def worker_pid():
+    return os.getpid()
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # Pool processes find a pipeline already set and skip building one
+    monkeypatch.setattr(asgi, '_pipeline', object())
+    app = SimpleNamespace(state=SimpleNamespace(cpu_pool=asgi._start_cpu_pool(), cpu_pool_restarts=0))
+    yield app
+    app.state.cpu_pool.shutdown(wait=False)
+
+
+def test_cpu_pool_is_replaced_after_a_process_dies(app):
+    async def scenario():
+        before = await asgi._run_cpu(app, worker_pid)
+        broken = app.state.cpu_pool
+        with pytest.raises(BrokenProcessPool):
+            await asgi._run_cpu(app, crash)
+        assert app.state.cpu_pool is not broken
+        after = await asgi._run_cpu(app, worker_pid)
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert before != after
+    assert app.state.cpu_pool_restarts == 1
+
+
+def test_jobs_submitted_to_a_broken_pool_run_on_a_new_one(app):
+    async def scenario():
+        broken = app.state.cpu_pool
+        with pytest.raises(BrokenProcessPool):
+            await asyncio.get_running_loop().run_in_executor(broken, crash)
+        # Nothing replaced the pool yet: the next job finds it broken at submit
+        return await asgi._run_cpu(app, worker_pid)
+
+    assert asyncio.run(scenario()) != os.getpid()
+    assert app.state.cpu_pool_restarts == 1
@@ -0,0 +1,108 @@
+"""Stage1Pipeline.process_batch and /analyze/batch: per-item errors, the size limit and the result cache."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import app as app_module
+from Stage_1_Filtering.nltk_resources import is_installed, punkt_resource
+from Stage_1_Filtering.pipeline import Stage1Pipeline
+
+pytestmark = pytest.mark.skipif(
+    not is_installed(punkt_resource()[1]), reason="Punkt model not installed (python -m Stage_1_Filtering.nltk_resources)"
+)
+
+ARTICLE = "Government officials said the new policy would affect thousands of residents across the region. " * 30
+PAGE = f"<html><head><title>Stub story</title></head><body><article>{ARTICLE}</article></body></html>".encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def pipeline():
+    return Stage1Pipeline()
+
+
+def mixed_items(origin):
+    return [
+        {'input_type': 'text', 'content': ARTICLE, 'title': 'Policy'},
+        {'input_type': 'text', 'content': 123},
+        {'input_type': 'url', 'content': f'http://127.0.0.1:{origin.server_port}/story'},
+        'not an object',
+        {'input_type': 'video', 'content': 'https://example.com/clip'},
+        {'input_type': 'text', 'content': ARTICLE, 'title': ['Policy']},
+        {'content': ARTICLE + ' More.', 'domain': None},
+    ]
+
+
+def test_invalid_items_fail_alone(pipeline, origin):
+    results = pipeline.process_batch(mixed_items(origin))
+    assert [result is not None for result in results] == [True, False, True, False, False, False, True]
+    assert results[0]['title'] == 'Policy'
+    assert results[2]['title'] == 'Stub story'
+    assert results[6]['domain'] == 'user_input'
+
+
+def test_batch_endpoint_reports_errors_per_item(pipeline, origin):
+    client = app_module.create_app(pipeline=pipeline).test_client()
+    body = client.post('/analyze/batch', json={'items': mixed_items(origin)}).get_json()
+    assert body['status'] == 'success'
+    assert [r['status'] for r in body['results']] == ['success', 'error', 'success', 'error', 'error', 'error',
+                                                      'success']
+    assert [r.get('message') for r in body['results'] if r['status'] == 'error'] == [
+        'content must be a string', 'Each item must be an object', 'Unknown input type', 'title must be a string',
+    ]
+    assert body['results'][2]['result']['title'] == 'Stub story'
+
+
+def test_batch_size_limit(pipeline, monkeypatch):
+    monkeypatch.setattr(app_module, 'MAX_BATCH_SIZE', 2)
+    client = app_module.create_app(pipeline=pipeline).test_client()
+    items = [{'input_type': 'text', 'content': ARTICLE}] * 3
+    assert client.post('/analyze/batch', json={'items': items}).get_json() == {
+        'status': 'error', 'message': 'Batch exceeds 2 items'
+    }
+    body = client.post('/analyze/batch', json={'items': items[:2]}).get_json()
+    assert [r['status'] for r in body['results']] == ['success', 'success']
+    for payload in ({'items': []}, {'items': 'text'}, ['items']):
+        assert client.post('/analyze/batch', json=payload).get_json()['message'] == 'No items provided'
+
+
+def test_batch_uses_the_result_cache(pipeline, origin):
+    items = [{'input_type': 'text', 'content': ARTICLE, 'title': 'Policy'},
+             {'input_type': 'url', 'content': f'http://127.0.0.1:{origin.server_port}/story'}]
+    first = pipeline.process_batch(items)
+    assert [result['cache_hit'] for result in first] == [False, False]
+    second = pipeline.process_batch(items)
+    assert [result['cache_hit'] for result in second] == [True, True]
+    assert origin.requests == 1
+    # Single-item calls share the cache with batches
+    assert pipeline.process_text(ARTICLE, 'Policy')['cache_hit'] is True
+
+    # use_cache=False neither reads nor fills the cache
+    uncached = pipeline.process_batch(items + [{'input_type': 'text', 'content': ARTICLE + ' Again.'}],
+                                      use_cache=False)
+    assert len(uncached) == 3 and not any(result.get('cache_hit') for result in uncached)
+    assert origin.requests == 2
+    assert pipeline.process_text(ARTICLE + ' Again.')['cache_hit'] is False
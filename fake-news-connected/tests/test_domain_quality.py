@@ -0,0 +1,159 @@
+import csv
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from domain_quality.domain_quality import DomainQualityDB
+from domain_quality.ratings_store import RATER_COLUMNS
+from domain_quality.snapshot import build_snapshot
+from Stage_1_Filtering.result_cache import ResultCache
+
+DOMAINS = {'cnn.com': 0.9, 'reuters.com': 1.0, 'infowars.com': 0.05}
+
+
+def write_release(directory, cnn_score):
+    """Write domain_pc1.csv and domain_ratings.csv, each replaced in one step as a deploy would."""
+    scores = dict(DOMAINS, **{'cnn.com': cnn_score})
+    files = {
+        'domain_pc1.csv': (['domain', 'pc1'], [[d, s] for d, s in scores.items()]),
+        'domain_ratings.csv': (['domain', 'pc1', 'afm'], [[d, s, s / 2] for d, s in scores.items()]),
+    }
+    for name, (header, rows) in files.items():
+        path = os.path.join(directory, name)
+        with open(path + '.tmp', 'w', newline='') as f:
+            csv.writer(f).writerows([header] + rows)
+        # Same size and mtime granularity could hide a rewrite from the change check
+        mtime = time.time_ns() + 10 ** 9
+        os.utime(path + '.tmp', ns=(mtime, mtime))
+        os.replace(path + '.tmp', path)
+    return os.path.join(directory, 'domain_pc1.csv'), os.path.join(directory, 'domain_ratings.csv')
+
+
+@pytest.fixture
+def release_dir(tmp_path):
+    write_release(tmp_path, 0.9)
+    return tmp_path
+
+
+def open_db(directory, reload_interval=0.01):
+    return DomainQualityDB(
+        os.path.join(directory, 'domain_pc1.csv'),
+        ratings_path=os.path.join(directory, 'domain_ratings.csv'),
+        snapshot_path=None,
+        reload_interval=reload_interval,
+    )
+
+
+def wait_for(condition, timeout=10):
+    stop = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > stop:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.02)
+
+
+def test_current_version_reloads_without_lookups(release_dir):
+    db = open_db(release_dir)
+    cache = ResultCache(maxsize=10, path=None, ratings_version=db.current_version)
+    old_version = db.current_version()
+    cache.put('key', {'ratings_version': old_version}, 60)
+    assert cache.get('key') is not None
+
+    write_release(release_dir, 0.1)
+    # Only the cache asks for the version, as in the async server process
+    wait_for(lambda: db.current_version() != old_version)
+    assert cache.get('key') is None
+    cache.put('key', {'ratings_version': db.current_version()}, 60)
+    assert cache.get('key') is not None
+    assert db.get_domain_info('cnn.com')['score'] == 0.1
+
+
+def test_lookups_during_reloads_see_one_release(release_dir):
+    pc1_path, ratings_path = write_release(release_dir, 0.9)
+    snapshot_path = os.path.join(release_dir, 'domain_quality.snap')
+    build_snapshot(pc1_path, ratings_path, snapshot_path)
+    db = DomainQualityDB(pc1_path, ratings_path=ratings_path, snapshot_path=snapshot_path, reload_interval=0.01)
+
+    seen, errors = set(), []
+    stop = threading.Event()
+
+    def lookups():
+        while not stop.is_set():
+            try:
+                info = db.get_domain_info('news.cnn.com')
+            except Exception as e:
+                errors.append(e)
+                return
+            seen.add((info['ratings_version'], info['score'], info['ratings'].pc1, info['ratings'].afm))
+
+    threads = [threading.Thread(target=lookups) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for score in (0.1, 0.5, 0.95):
+            # CSVs first, so lookups go through the CSV release, then the snapshot
+            write_release(release_dir, score)
+            wait_for(lambda: db.get_domain_info('cnn.com')['score'] == score)
+            build_snapshot(pc1_path, ratings_path, snapshot_path)
+            wait_for(lambda: db._stamp == db._source_stamp())
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    # Every answer comes from a single release: one version never mixes scores. A
+    # reload between the two CSV writes pairs the new pc1 with the old ratings, but
+    # that release has a version of its own
+    versions = {}
+    for version, *scores in seen:
+        assert versions.setdefault(version, scores) == scores
+    assert {0.9, 0.1, 0.5, 0.95} <= {score for score, _, _ in versions.values()}
+    info = db.get_domain_info('news.cnn.com')
+    assert (info['score'], info['ratings'].pc1, info['ratings'].afm) == (0.95, 0.95, 0.95 / 2)
+
+
+def test_get_many_inherits_parent_ratings(release_dir):
+    db = open_db(release_dir)
+    rows = db.get_many(['cnn.com', 'Edition.CNN.com', 'unknown.org', ''])
+    assert rows.shape == (4, len(RATER_COLUMNS))
+    assert rows[0].tolist()[:2] == [0.9, 0.45]
+    np.testing.assert_array_equal(rows[1], rows[0])
+    assert np.isnan(rows[2:]).all()
+    assert db.get_domain_info('edition.cnn.com')['ratings'].afm == rows[1][1]
+
+
+def test_get_many_without_ratings_file(release_dir):
+    os.remove(os.path.join(release_dir, 'domain_ratings.csv'))
+    db = open_db(release_dir)
+    rows = db.get_many(['cnn.com', 'edition.cnn.com'])
+    assert rows.shape == (2, len(RATER_COLUMNS)) and np.isnan(rows).all()
+    assert db.get_domain_info('edition.cnn.com')['ratings'] is None
+
+
+def test_snapshot_lookups_match_csv_lookups(tmp_path):
+    scores = dict(DOMAINS, **{'blogspot.com': 0.7, 'facebook.com/news': 0.6, 'bbc.co.uk': 0.95, 'co.uk': 0.3})
+    pc1_path, ratings_path = tmp_path / 'domain_pc1.csv', tmp_path / 'domain_ratings.csv'
+    with open(pc1_path, 'w', newline='') as f:
+        csv.writer(f).writerows([['domain', 'pc1']] + [[d, s] for d, s in scores.items()])
+    # A ratings file with fewer columns than RATER_COLUMNS, and one domain without pc1
+    with open(ratings_path, 'w', newline='') as f:
+        csv.writer(f).writerows([['domain', 'pc1', 'mbfc']] + [[d, s, s / 2] for d, s in scores.items()]
+                                + [['ratings-only.org', 0.4, 0.1]])
+    snapshot_path = str(tmp_path / 'domain_quality.snap')
+    build_snapshot(str(pc1_path), str(ratings_path), snapshot_path)
+    mapped = DomainQualityDB(str(pc1_path), ratings_path=str(ratings_path), snapshot_path=snapshot_path,
+                             reload_interval=0)
+    parsed = DomainQualityDB(str(pc1_path), ratings_path=str(ratings_path), snapshot_path=None, reload_interval=0)
+    assert mapped.release.snapshot is not None and parsed.release.snapshot is None
+
+    queries = [d for domain in scores for d in (domain, 'www.' + domain, 'a.b.' + domain)]
+    queries += ['me.blogspot.com', 'facebook.com', 'ratings-only.org', 'www.ratings-only.org', 'uk', '', 'x.org']
+    for domain in queries:
+        assert mapped.get_domain_info(domain) == parsed.get_domain_info(domain), domain
+    np.testing.assert_array_equal(mapped.get_many(queries), parsed.get_many(queries))
+    assert mapped.get_domain_info('edition.cnn.com')['matched_domain'] == 'cnn.com'
+    assert mapped.get_domain_info('me.blogspot.com')['matched_domain'] is None
@@ -0,0 +1,85 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Stage_1_Filtering.fetcher import FetchDeadlineExceeded, FetchEngine, ResponseTooLarge
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path.startswith('/slow'):
+            time.sleep(self.server.delay)
+        body = b'x' * (self.server.size if self.path.startswith('/big') else 100)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(delay=0.0, size=0):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.size = size
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def servers():
+    slow, fast = start_server(delay=0.5), start_server(size=2000)
+    yield f'http://127.0.0.1:{slow.server_port}', f'http://127.0.0.1:{fast.server_port}'
+    slow.shutdown()
+    fast.shutdown()
+
+
+def wait_until_idle(fetcher, timeout=10):
+    stop = time.monotonic() + timeout
+    while fetcher._hosts and time.monotonic() < stop:
+        time.sleep(0.05)
+
+
+def test_slow_host_does_not_starve_other_hosts(servers):
+    slow, fast = servers
+    fetcher = FetchEngine(max_workers=8, per_host_limit=2, deadline=20)
+    queued = [fetcher.submit(f'{slow}/slow?{i}') for i in range(20)]
+    started = time.monotonic()
+    assert fetcher.fetch(f'{fast}/page').status_code == 200
+    assert time.monotonic() - started < 0.4
+    # The slow host never had more than per_host_limit requests running
+    assert fetcher._hosts[slow[len('http://'):]].active <= 2
+    for future in queued:
+        future.cancel()
+    wait_until_idle(fetcher)
+
+
+def test_queued_requests_fail_at_their_deadline(servers):
+    slow, _ = servers
+    fetcher = FetchEngine(max_workers=8, per_host_limit=1)
+    results = fetcher.fetch_many([f'{slow}/slow?{i}' for i in range(4)], deadline=0.8)
+    assert results[0].status_code == 200
+    assert all(isinstance(result, FetchDeadlineExceeded) for result in results[1:])
+    wait_until_idle(fetcher)
+
+
+def test_idle_hosts_are_forgotten(servers):
+    _, fast = servers
+    fetcher = FetchEngine(max_workers=4, per_host_limit=2)
+    assert all(response.status_code == 200 for response in fetcher.fetch_many([f'{fast}/page'] * 6))
+    wait_until_idle(fetcher)
+    assert fetcher._hosts == {}
+
+
+def test_body_over_max_bytes_is_rejected(servers):
+    _, fast = servers
+    fetcher = FetchEngine(max_bytes=1000)
+    with pytest.raises(ResponseTooLarge):
+        fetcher.fetch(f'{fast}/big')
+    assert len(fetcher.fetch(f'{fast}/page').content) == 100
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+from Stage_1_Filtering import file_extractor
+from Stage_1_Filtering.file_extractor import extract_text, join_within_budget
+
+
+class ReadOnlyStream:
+    """Binary stream with nothing but read(), like SpooledTemporaryFile before Python 3.11."""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._data.read(size)
+
+
+def test_plain_text_needs_only_read(monkeypatch):
+    # Tiny chunks split the multi-byte characters between reads
+    monkeypatch.setattr(file_extractor, 'TEXT_CHUNK_SIZE', 3)
+    text = "Café naïve — résumé " * 5
+    assert extract_text('notes.txt', ReadOnlyStream(text.encode('utf-8'))) == text
+
+
+def test_plain_text_rejects_invalid_utf8():
+    with pytest.raises(UnicodeDecodeError):
+        extract_text('notes.txt', ReadOnlyStream(b'abc\xff'))
+
+
+def test_plain_text_stops_at_word_budget():
+    text = extract_text('long.txt', io.BytesIO(b'word ' * 100000), max_words=10)
+    assert 10 < len(text.split()) < 100000
+
+
+def test_join_within_budget_counts_words_split_across_pieces():
+    assert join_within_budget(['one tw', 'o three'], max_words=5) == 'one two three'
+    assert len(join_within_budget(['a b ', 'c d ', 'e f '], max_words=3).split()) == 4
+
+
+@pytest.mark.parametrize('filename, parser', [
+    ('report.pdf', 'iter_pdf_text'), ('REPORT.PDF', 'iter_pdf_text'), ('Letter.Docx', 'iter_docx_text'),
+])
+def test_extension_is_matched_in_any_case(monkeypatch, filename, parser):
+    def fake_parser(stream):
+        yield parser
+
+    monkeypatch.setattr(file_extractor, parser, fake_parser)
+    assert extract_text(filename, io.BytesIO(b'')) == parser
@@ -0,0 +1,114 @@
+"""ParsePool behaviour under slow, runaway and crashing parsers, seen through /analyze.
+
+The stub parsers run in the pool processes, so they are module-level functions.
+"""
+import io
+import os
+import time
+
+import pytest
+
+from app import create_app
+from Stage_1_Filtering.parse_pool import ParsePool
+
+
+def echo_parser(filename, stream, max_words):
+    return stream.read().decode('utf-8')
+
+
+def spinning_parser(filename, stream, max_words):
+    while True:
+        pass
+
+
+def sleeping_parser(filename, stream, max_words):
+    time.sleep(3)
+    return ''
+
+
+def crash_once_parser(filename, stream, max_words):
+    if filename == 'crash.pdf':
+        os._exit(1)
+    return echo_parser(filename, stream, max_words)
+
+
+class TextPipeline:
+    """Stands in for Stage1Pipeline: passes the extracted text through as the title."""
+
+    def process_text(self, text, title="", input_type='text'):
+        return {'title': text, 'ready_for_stage2': True}
+
+
+@pytest.fixture
+def make_client():
+    pools = []
+
+    def make_client(extractor, **options):
+        settings = {'workers': 1, 'max_queue': 0, 'timeout': 10, 'cpu_limit': 1}
+        settings.update(options)
+        pool = ParsePool(extractor=extractor, **settings)
+        pools.append(pool)
+        return create_app(pipeline=TextPipeline(), parse_pool=pool).test_client(), pool
+
+    yield make_client
+    for pool in pools:
+        pool.shutdown()
+
+
+def counter_reaches(pool, name, value, timeout=5):
+    # Counters are updated by future callbacks, which may run just after the response
+    deadline = time.monotonic() + timeout
+    while pool.stats()[name] < value and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return pool.stats()[name] == value
+
+
+def upload(client, filename='doc.pdf', data=b'parsed text'):
+    return client.post('/analyze', data={'input_type': 'file', 'file': (io.BytesIO(data), filename)})
+
+
+def test_parsed_text_is_analyzed(make_client):
+    client, pool = make_client(echo_parser)
+    response = upload(client)
+    assert response.status_code == 200
+    assert response.get_json()['result']['title'] == 'parsed text'
+    assert counter_reaches(pool, 'completed', 1)
+
+
+def test_cpu_limit_is_422(make_client):
+    client, pool = make_client(spinning_parser)
+    response = upload(client)
+    assert response.status_code == 422
+    assert response.get_json()['status'] == 'error'
+    assert counter_reaches(pool, 'cpu_limited', 1)
+
+
+def test_timeout_is_503(make_client):
+    client, pool = make_client(sleeping_parser, timeout=0.3)
+    started = time.monotonic()
+    response = upload(client)
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+    assert time.monotonic() - started < 2
+    assert pool.stats()['timed_out'] == 1
+
+
+def test_saturated_pool_is_429(make_client):
+    client, pool = make_client(sleeping_parser)
+    busy = pool.submit('doc.pdf', b'')
+    response = upload(client)
+    assert response.status_code == 429
+    assert response.headers['Retry-After']
+    assert pool.stats()['rejected'] == 1
+    busy.cancel()
+
+
+def test_pool_restarts_after_a_parse_process_dies(make_client):
+    client, pool = make_client(crash_once_parser)
+    response = upload(client, 'crash.pdf')
+    assert response.get_json()['status'] == 'error'
+    response = upload(client, 'doc.pdf')
+    assert response.get_json()['result']['title'] == 'parsed text'
+    assert counter_reaches(pool, 'completed', 1)
+    stats = pool.stats()
+    assert stats['restarts'] == 1 and stats['failed'] == 1 and stats['completed'] == 1
@@ -0,0 +1,112 @@
+"""KEYWORD_MATCHER, DNS_PROVIDER_MATCHER and suspicious_extension against the set loops they replaced."""
+from urllib.parse import urlparse
+
+import pytest
+import tldextract
+
+from urlworkxml import (DNS_PROVIDER_MATCHER, KEYWORD_MATCHER, SUSPICIOUS_DNS_PROVIDERS, SUSPICIOUS_EXTENSIONS,
+                        SUSPICIOUS_KEYWORDS, KeywordMatcher, suspicious_extension)
+
+# Covers keywords that are prefixes or parts of others (verify/verifyidentity, secure/security,
+# wallet/cryptowallet), share a prefix (update/upgrade, account/access) or overlap (bitcoinsbase)
+URLS = [
+    "https://www.example.com/",
+    "http://secure-login.paypal.com.example.tk/webscr?cmd=_login&token=abc",
+    "https://verifyidentity.account-security.example.xyz/verify/update?upgrade=1",
+    "https://cryptowallet.example.online/wallet/bitcoinsbase/coinbase",
+    "http://signin.microsoft.office365.example.website/signin?continue=windows",
+    "https://my.site/checkout/free-gift?reward=prize&claim=now",
+    "https://news.example.co.uk/world/2024/article.html?ref=homepage",
+    "http://SUPPORT.Apple.com.example.info/Account/Unlock?Password=reset",
+    "https://example.com/securitysecurelogin/verifyverifyidentityverify",
+    "https://accountant.example.net/accounts?access=adminadmin",
+    "http://exchangewebmail.example.click/?surveyurgent&suspendalert",
+    "https://localhost/index",
+    "https://xn--bcher-kva.example.de/?q=",
+]
+
+NAME_SERVERS = [
+    [],
+    ["ns1.google.com", "ns2.google.com"],
+    ["ns1.afraid.org"],
+    ["ns3.afraid.org", "dns1.freehostingnoads.net"],
+    ["ns1.freehosting.com"],
+    ["ns1.000webhost.com", "ns1.000a.biz"],
+    ["pdns1.registrar-servers.com", "NS1.BODIS.COM"],
+    ["ns01.domaincontrol.com", "ns1.inmotionhosting.com.example.net"],
+    ["ns2.parklogic.com.cdn.cloudflare.net"],
+]
+
+
+def old_keywords(path, query):
+    hits = []
+    for keyword in SUSPICIOUS_KEYWORDS:
+        if keyword in path:
+            hits.append(keyword)
+        if keyword in query:
+            hits.append(keyword)
+    return hits
+
+
+def new_keywords(path, query):
+    in_path = KEYWORD_MATCHER.find_all(path)
+    in_query = KEYWORD_MATCHER.find_all(query)
+    return [keyword for keyword in KEYWORD_MATCHER.ordered(in_path | in_query)
+            for found in (in_path, in_query) if keyword in found]
+
+
+def old_subdomain(subdomain):
+    for keyword in SUSPICIOUS_KEYWORDS:
+        if keyword in subdomain:
+            return keyword
+    return None
+
+
+def old_name_servers(name_servers):
+    return any(any(provider in ns for provider in SUSPICIOUS_DNS_PROVIDERS) for ns in name_servers)
+
+
+def old_extension(domain):
+    for extension in SUSPICIOUS_EXTENSIONS:
+        if domain.endswith(extension):
+            return extension
+    return None
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_url_checks_match_the_set_loops(url):
+    parsed = urlparse(url)
+    path, query = parsed.path.lower(), parsed.query.lower()
+    assert new_keywords(path, query) == old_keywords(path, query)
+
+    subdomain = tldextract.extract(url).subdomain.lower()
+    assert KEYWORD_MATCHER.first(subdomain) == old_subdomain(subdomain)
+    for text in (subdomain, path, query):
+        assert KEYWORD_MATCHER.find_all(text) == {keyword for keyword in SUSPICIOUS_KEYWORDS if keyword in text}
+
+    domain = parsed.hostname
+    assert suspicious_extension(domain) == old_extension(domain)
+
+
+@pytest.mark.parametrize("name_servers", NAME_SERVERS)
+def test_name_server_check_matches_the_set_loop(name_servers):
+    lowered = [ns.lower() for ns in name_servers]
+    assert any(DNS_PROVIDER_MATCHER.search(ns) for ns in lowered) == old_name_servers(lowered)
+    for ns in lowered:
+        assert DNS_PROVIDER_MATCHER.find_all(ns) == {p for p in SUSPICIOUS_DNS_PROVIDERS if p in ns}
+
+
+def test_extension_needs_a_whole_label():
+    for domain in ("example.website", "example.site", "examplexyz", "xyz", "example.tk.com", ".tk", ""):
+        assert suspicious_extension(domain) == old_extension(domain)
+
+
+def test_nested_and_overlapping_keywords():
+    keywords = ["b", "abc", "a", "bcd", "ab", "abcd", "cd", "d"]
+    matcher = KeywordMatcher(keywords)
+    for text in ("", "abcd", "xabcdx", "aabbccdd", "dcba", "ababcbcd", "zzz"):
+        expected = [keyword for keyword in keywords if keyword in text]
+        assert matcher.find_all(text) == set(expected)
+        assert matcher.ordered(matcher.find_all(text)) == expected
+        assert matcher.first(text) == (expected[0] if expected else None)
+        assert matcher.search(text) == bool(expected)
@@ -0,0 +1,90 @@
+"""fast_tokenize against word_tokenize on the text it is meant for: clean_text output of news
+prose, lowercased, where punctuation trails the words it belongs to."""
+import random
+
+import pytest
+from nltk.tokenize import word_tokenize
+
+from Stage_1_Filtering.nltk_resources import is_installed, punkt_resource
+from Stage_1_Filtering.preprocessor import NewsPreprocessor, fast_tokenize, punkt_abbreviations
+
+pytestmark = pytest.mark.skipif(
+    not is_installed(punkt_resource()[1]), reason="Punkt model not installed (python -m Stage_1_Filtering.nltk_resources)"
+)
+
+# News-style text with the cases fast_tokenize has rules for: abbreviations, initials,
+# numbers with separators, dot runs, dashes, sentence-final !? and the split words
+NEWS = [
+    "WASHINGTON (Reuters) - The U.S. Senate voted 52-48 on Tuesday to approve a $1.2 trillion spending bill... "
+    "Sen. John Smith, R-Texas, said the measure was \"long overdue\". Officials at the U.N. declined to comment.",
+    "Shares of Acme Corp. fell 3.5% to $42.10 at 10 a.m. after the company reported revenue of 1,250 million "
+    "dollars -- well below analysts' forecasts. \"We're disappointed,\" CEO Jane Doe told CNBC.",
+    "In 2020. the pandemic changed everything. Dr. Fauci warned that cases could rise to 100,000 per day! "
+    "Is that true? Experts aren't sure... Many said: 'wait and see'.",
+    "BREAKING: Scientists can't explain the new findings, e.g. the high-energy particles detected on Jan. 5th. "
+    "The team---led by Prof. Lee---published in Nature (vol. 12, no. 3).",
+    "He said he's gonna win, and they wanna believe him; cannot argue with that. Gimme a break, lemme think, "
+    "gotta go. They said wanna. Then gonna. And cannot.",
+    "The 3-2 decision was announced at 5 p.m. ET.  More than 1,000,000 people, i.e. most residents, were "
+    "affected. Read more at https://example.com/news?id=5 ...",
+    "J. R. Smith Jr. of St. Louis, Mo., told Mr. and Mrs. Jones on Sept. 3 that No. 1 was out.. really?! "
+    "The vote was 7-2. A spokesman for Gov. Lee Co. Ltd. said: no comment, etc.",
+]
+
+
+def news_corpus(documents=2000, seed=0):
+    """The NEWS paragraphs as clean_text leaves them, then documents of their words shuffled."""
+    preprocessor = NewsPreprocessor()
+    texts = [preprocessor.clean_text(paragraph).lower() for paragraph in NEWS]
+    words = ' '.join(texts).split()
+    rnd = random.Random(seed)
+    for _ in range(documents):
+        texts.append(' '.join(rnd.choice(words) for _ in range(rnd.randint(5, 120))))
+    return texts
+
+
+def punctuation_corpus(documents=3000, seed=0):
+    """Short documents of news words and abbreviations with punctuation glued on at random."""
+    words = ' '.join(NEWS).lower().split() + sorted(punkt_abbreviations())
+    endings = ['', '', '', '', '.', ',', '!', '?', '.,', '.!', '.?', '...', '..', ' --', '?!', '!,', '?,']
+    rnd = random.Random(seed)
+    preprocessor = NewsPreprocessor()
+    return [
+        preprocessor.clean_text(' '.join(rnd.choice(words) + rnd.choice(endings) for _ in range(rnd.randint(2, 12))))
+        for _ in range(documents)
+    ]
+
+
+@pytest.mark.parametrize('corpus', [news_corpus, punctuation_corpus])
+def test_fast_tokenize_matches_word_tokenize(corpus):
+    mismatches = [text for text in corpus() if fast_tokenize(text) != word_tokenize(text)]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize('text, tokens', [
+    # Split words, including with the sentence's final period attached
+    ('they wanna go.', ['they', 'wan', 'na', 'go', '.']),
+    ('i wanna.', ['i', 'wan', 'na', '.']),
+    ('gonna. ok', ['gon', 'na', '.', 'ok']),
+    ('we cannot.', ['we', 'can', 'not', '.']),
+    # Commas split except before a digit; dot runs and double dashes are tokens
+    ('1,000 people, 2 cats', ['1,000', 'people', ',', '2', 'cats']),
+    ('wait... what?!', ['wait', '...', 'what', '?', '!']),
+    ('the team--led by him', ['the', 'team', '--', 'led', 'by', 'him']),
+    ('he won. she lost!', ['he', 'won', '.', 'she', 'lost', '!']),
+    ('it is. !', ['it', 'is', '.', '!']),
+    # A sentence end inside the next chunk also ends one at a kept period
+    ('in 2020. won., ok', ['in', '2020', '.', 'won.', ',', 'ok']),
+    ('in 2020. what?! ok', ['in', '2020', '.', 'what', '?', '!', 'ok']),
+    ('in 2020. j., ok', ['in', '2020.', 'j.', ',', 'ok']),
+    # and a text ending in 'word.!' ends a sentence at the period
+    ('he won.!', ['he', 'won', '.', '!']),
+    ('he won.! ok', ['he', 'won.', '!', 'ok']),
+    # but the period stays on the word before a run of marks
+    ('it et.?! ok', ['it', 'et.', '?', '!', 'ok']),
+    # A comma without a space joins two words for Punkt, so 'said,j.' is not an initial
+    ('he said,j. a', ['he', 'said', ',', 'j', '.', 'a']),
+])
+def test_fast_tokenize_pinned_cases(text, tokens):
+    assert fast_tokenize(text) == tokens
+    assert word_tokenize(text) == tokens
@@ -0,0 +1,68 @@
+import sqlite3
+import time
+
+from Stage_1_Filtering.article_record import ArticleRecord
+from Stage_1_Filtering.result_cache import ResultCache
+from caching.ttl_cache import SQLiteCache
+
+
+def pipeline_result(words=5000):
+    tokens = ['word%d' % i for i in range(words)]
+    return ArticleRecord(
+        url='https://news.example.com/a', domain='news.example.com', title='Title',
+        content=' '.join(tokens), content_clean=' '.join(tokens), content_tokens=tokens,
+        content_stemmed=tokens, word_count=words, ready_for_stage2=True,
+        overall_authenticity_score=0.8, ratings_version='v1',
+    )
+
+
+def test_hit_has_the_same_fields_as_a_miss(tmp_path):
+    cache = ResultCache(maxsize=10, path=str(tmp_path / 'results.db'))
+    result = pipeline_result()
+    cache.put('key', result, 60)
+
+    for reader in (cache, ResultCache(maxsize=10, path=str(tmp_path / 'results.db'))):
+        hit = reader.get('key')
+        assert hit['cache_hit'] is True
+        assert dict(hit, cache_hit=False) == dict(result)
+
+
+def test_hits_do_not_share_state_with_the_cache():
+    cache = ResultCache(maxsize=10, path=None)
+    result = pipeline_result(10)
+    result.update(redirect_chain=['https://a.example.com/'], domain_ratings={'afm': 0.5})
+    cache.put('key', result, 60)
+    result['redirect_chain'].append('https://b.example.com/')
+
+    hit = cache.get('key')
+    hit['domain_ratings']['afm'] = 0.0
+    hit['redirect_chain'].append('https://c.example.com/')
+    again = cache.get('key')
+    assert again['redirect_chain'] == ['https://a.example.com/']
+    assert again['domain_ratings'] == {'afm': 0.5}
+
+
+def test_stale_ratings_version_is_a_miss():
+    version = ['v1']
+    cache = ResultCache(maxsize=10, path=None, ratings_version=lambda: version[0])
+    cache.put('key', pipeline_result(10), 60)
+    assert cache.get('key') is not None
+    version[0] = 'v2'
+    assert cache.get('key') is None
+    assert cache.stats()['stale'] == 1
+
+
+def count_rows(path, table):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_shared_store_deletes_expired_rows(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    store = SQLiteCache(path, purge_interval=0.05)
+    for i in range(20):
+        store.set('old%d' % i, i, ttl=0.01)
+    time.sleep(0.1)
+    store.set('new', 1, ttl=60)
+    assert count_rows(path, 'cache') == 1
+    assert store.get('new')[0] == 1
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import urlworkxml
+from caching.ttl_cache import TieredCache
+from config.settings import WHOISXML_API_KEY
+
+
+class WhoisHandler(BaseHTTPRequestHandler):
+    """Stands in for the WHOISXML API; domains starting with 'broken' get a 500."""
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query, keep_blank_values=True)
+        domain = query['domainName'][0]
+        self.server.requests.append(domain)
+        self.server.api_keys.append(query['apiKey'][0])
+        if domain.startswith('broken'):
+            self.send_response(500)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps({'WhoisRecord': {'domainName': domain, 'registrarName': 'Example Registrar'}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    """Serves every site as an HTTP proxy; sites of redir-* domains redirect to another domain."""
+
+    def do_GET(self):
+        host = urlsplit(self.path).hostname
+        if 'redir-' in host:
+            self.send_response(302)
+            self.send_header('Location', 'http://landing.example.net/welcome')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def whois_api(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), WhoisHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.api_keys = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(urlworkxml, 'WHOISXML_API_URL', f'http://127.0.0.1:{server.server_port}/whois')
+    yield server
+    server.shutdown()
+
+
+def use_cache(monkeypatch, path=None):
+    cache = TieredCache(100, path, table='whois')
+    monkeypatch.setattr(urlworkxml, 'whois_cache', cache)
+    return cache
+
+
+def test_subdomains_share_one_lookup(whois_api, monkeypatch):
+    use_cache(monkeypatch)
+    first = urlworkxml.get_whoisxml_data('news.example.com')
+    assert first['Domain Name'] == 'example.com'
+    assert urlworkxml.get_whoisxml_data('https://Example.com/story') == first
+    assert urlworkxml.get_whoisxml_data('www.example.com') == first
+    assert whois_api.requests == ['example.com']
+
+
+def test_errors_are_cached_for_the_negative_ttl(whois_api, monkeypatch):
+    use_cache(monkeypatch)
+    monkeypatch.setattr(urlworkxml, 'WHOIS_NEGATIVE_TTL', 0.3)
+    error = urlworkxml.get_whoisxml_data('broken-news.com')
+    assert error.startswith('Error fetching WHOISXML data')
+    assert urlworkxml.get_whoisxml_data('www.broken-news.com') == error
+    assert whois_api.requests == ['broken-news.com']
+    time.sleep(0.4)
+    urlworkxml.get_whoisxml_data('broken-news.com')
+    assert whois_api.requests == ['broken-news.com'] * 2
+
+
+def test_workers_read_through_the_shared_store(whois_api, monkeypatch, tmp_path):
+    path = str(tmp_path / 'whois.sqlite3')
+    use_cache(monkeypatch, path)
+    record = urlworkxml.get_whoisxml_data('example.org')
+    # Another worker: its own memory tier, the same SQLite file
+    other = use_cache(monkeypatch, path)
+    assert urlworkxml.get_whoisxml_data('news.example.org') == record
+    assert whois_api.requests == ['example.org']
+    assert other.stats()['shared_hits'] == 1
+    # The shared hit now also sits in that worker's memory tier
+    assert urlworkxml.get_whoisxml_data('example.org') == record
+    assert other.stats()['hits'] == 1
+
+
+def test_single_and_bulk_checks_send_the_same_key(whois_api, monkeypatch):
+    monkeypatch.setattr(urlworkxml, 'check_redirection', lambda url: None)
+    use_cache(monkeypatch)
+    single = urlworkxml.detect_phishing('https://news.example.net/a')
+    use_cache(monkeypatch)
+    assert urlworkxml.detect_phishing_many(['https://news.example.net/a'], workers=2) == [single]
+    use_cache(monkeypatch)
+    urlworkxml.detect_phishing('https://example.net/', api_key='other-key')
+    assert whois_api.api_keys == [WHOISXML_API_KEY, WHOISXML_API_KEY, 'other-key']
+
+
+@pytest.fixture
+def origin(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OriginHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Any site name resolves: redirect checks go through the stub as a proxy, the WHOIS stub is direct
+    monkeypatch.setenv('http_proxy', f'http://127.0.0.1:{server.server_port}')
+    monkeypatch.setenv('no_proxy', '127.0.0.1')
+    yield server
+    server.shutdown()
+
+
+def test_bulk_check_looks_up_each_domain_once(whois_api, origin, monkeypatch):
+    use_cache(monkeypatch)
+    urls = [
+        'http://news.example.com/a', 'http://www.example.com/b', 'http://example.com/a?page=2',
+        'http://sports.example.org/', 'http://example.org/login', 'http://news.example.com/a',
+        'http://redir-offers.com/go', 'http://www.redir-offers.com/go',
+    ] * 5
+    results = urlworkxml.detect_phishing_many(urls, workers=4)
+
+    assert sorted(whois_api.requests) == ['example.com', 'example.org', 'redir-offers.com']
+    assert [result['domain'] for result in results[:8]] == [
+        'example.com', 'example.com', 'example.com', 'example.org', 'example.org', 'example.com',
+        'redir-offers.com', 'redir-offers.com',
+    ]
+    redirected = ['Suspicious redirection detected' in result['warnings'] for result in results]
+    assert redirected == ['redir-' in url for url in urls]
+    # Same answers as one detect_phishing per URL, which now finds every domain cached
+    assert results == [urlworkxml.detect_phishing(url) for url in urls]
+    assert len(whois_api.requests) == 3
@@ -1,5 +1,17 @@
-from config.settings import WHOISXML_API_KEY
+from config.settings import (
+    WHOISXML_API_KEY, WHOISXML_API_URL, WHOIS_TIMEOUT,
+    WHOIS_CACHE_PATH, WHOIS_CACHE_SIZE, WHOIS_CACHE_TTL, WHOIS_NEGATIVE_TTL,
+    PHISHING_CHECK_WORKERS,
+)
+from caching.ttl_cache import TieredCache
+import argparse
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 from datetime import datetime, timezone
 import tldextract
@@ -50,11 +62,89 @@ SUSPICIOUS_DNS_PROVIDERS = {
     "ns2.siteground.net", "ns1.dreamhost.com", "ns2.dreamhost.com", "ns3.dreamhost.com"
 }
 
+def _trie_regex(words):
+    """Regex alternation of words with common prefixes factored out, longest match first."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def branch(node):
+        alternatives = [re.escape(char) + branch(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        # A word ending here is a prefix of the longer ones below, which are tried first
+        return f'(?:{pattern})?' if '' in node else pattern
+
+    return branch(trie)
+
+class KeywordMatcher:
+    """Finds every keyword of a fixed set that occurs in a string, in one scan.
+
+    The keywords are compiled once into a single trie-shaped regex that matches
+    the longest keyword starting at a position. As in an Aho-Corasick automaton,
+    each match also reports every keyword contained in it, and the scan resumes
+    one character after the match start, so overlapping keywords are all found.
+    Hits are ordered like iterating over the keywords, so the first hit is the
+    keyword a loop over the set with a break would have stopped at.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._rank = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self._pattern = re.compile(_trie_regex(self.keywords))
+        self._outputs = {keyword: [other for other in self.keywords if other in keyword] for keyword in self.keywords}
+
+    def search(self, text):
+        """Whether any keyword occurs in text."""
+        return self._pattern.search(text) is not None
+
+    def find_all(self, text):
+        """The set of keywords occurring in text."""
+        hits = set()
+        match = self._pattern.search(text)
+        while match:
+            hits.update(self._outputs[match.group()])
+            match = self._pattern.search(text, match.start() + 1)
+        return hits
+
+    def ordered(self, hits):
+        """hits (keywords of this matcher) in keyword order."""
+        return sorted(hits, key=self._rank.__getitem__)
+
+    def first(self, text):
+        """The first keyword (in keyword order) occurring in text, or None."""
+        hits = self.find_all(text)
+        return min(hits, key=self._rank.__getitem__) if hits else None
+
+KEYWORD_MATCHER = KeywordMatcher(SUSPICIOUS_KEYWORDS)
+DNS_PROVIDER_MATCHER = KeywordMatcher(SUSPICIOUS_DNS_PROVIDERS)
+
+def suspicious_extension(domain):
+    """The entry of SUSPICIOUS_EXTENSIONS that domain ends with, or None."""
+    # Every extension is a single dot-prefixed label, so only the last label can match
+    dot = domain.rfind('.')
+    extension = domain[dot:] if dot >= 0 else ''
+    return extension if extension in SUSPICIOUS_EXTENSIONS else None
+
+# WHOIS records change on the order of days, so lookups are cached per registrable
+# domain in memory and in a SQLite file shared by all workers. Errors are cached
+# briefly so a failing API is not hammered.
+whois_cache = TieredCache(WHOIS_CACHE_SIZE, WHOIS_CACHE_PATH, table="whois")
+_whois_session = requests.Session()
+# Room for every thread of detect_phishing_many to keep its API connection
+_whois_session.mount('https://', HTTPAdapter(pool_maxsize=PHISHING_CHECK_WORKERS))
+_whois_session.mount('http://', HTTPAdapter(pool_maxsize=PHISHING_CHECK_WORKERS))
+
 def check_redirection(url):
     """Check if the URL redirects and return the final destination"""
     try:
-        response = requests.get(url, allow_redirects=True, timeout=10)
-        final_url = response.url
+        # Only the final URL matters, so its body is never downloaded
+        with requests.get(url, allow_redirects=True, timeout=10, stream=True) as response:
+            final_url = response.url
         if get_domain(final_url) != get_domain(url):
             return final_url
         return None
@@ -63,12 +153,24 @@ def check_redirection(url):
 
 def get_domain(url):
     """Extract domain name from a URL"""
-    ext = tldextract.extract(url)
+    return _registrable_domain(tldextract.extract(url))
+
+def _registrable_domain(ext):
     return f"{ext.domain}.{ext.suffix}".lower()
 
 def get_whoisxml_data(domain, api_key=WHOISXML_API_KEY):
-    """Fetch WHOIS information of a domain using WHOISXML API"""
-    api_url = "https://www.whoisxmlapi.com/whoisserver/WhoisService"
+    """Fetch WHOIS information of a domain using WHOISXML API, cached per registrable domain"""
+    key = get_domain(domain)
+    cached = whois_cache.get(key)
+    if cached is not None:
+        return cached
+    result = fetch_whoisxml_data(key, api_key)
+    ttl = WHOIS_CACHE_TTL if isinstance(result, dict) else WHOIS_NEGATIVE_TTL
+    whois_cache.set(key, result, ttl)
+    return result
+
+def fetch_whoisxml_data(domain, api_key=WHOISXML_API_KEY):
+    """Query the WHOISXML API for a domain, bypassing the cache"""
     params = {
         "apiKey": api_key,
         "domainName": domain,
@@ -76,7 +178,7 @@ def get_whoisxml_data(domain, api_key=WHOISXML_API_KEY):
     }
     
     try:
-        response = requests.get(api_url, params=params)
+        response = _whois_session.get(WHOISXML_API_URL, params=params, timeout=WHOIS_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         whois_data = data.get("WhoisRecord", {})
@@ -100,20 +202,22 @@ def get_whoisxml_data(domain, api_key=WHOISXML_API_KEY):
     except Exception as e:
         return f"Error fetching WHOISXML data: {e}"
 
-def analyze_subdomain(url):
-    """Analyze the subdomain part of a URL for suspicious patterns."""
-    extracted = tldextract.extract(url)
+def analyze_subdomain(url, extracted=None):
+    """Analyze the subdomain part of a URL for suspicious patterns.
+
+    extracted is the URL's tldextract result, if the caller already has it.
+    """
+    extracted = extracted or tldextract.extract(url)
     subdomain = extracted.subdomain.lower()
     warnings = []
     risk_score = 0
     
     if subdomain:
         # Check for suspicious keywords
-        for keyword in SUSPICIOUS_KEYWORDS:
-            if keyword in subdomain:
-                risk_score += 2
-                warnings.append(f"Subdomain contains suspicious keyword '{keyword}'.")
-                break
+        keyword = KEYWORD_MATCHER.first(subdomain)
+        if keyword:
+            risk_score += 2
+            warnings.append(f"Subdomain contains suspicious keyword '{keyword}'.")
         
         # Check complexity
         if len(subdomain.split('.')) > 2:
@@ -189,7 +293,7 @@ def analyze_whois_data(domain, whois_data):
         warnings.append("No name servers listed.")
     else:
         for ns in name_servers:
-            if any(provider in ns.lower() for provider in SUSPICIOUS_DNS_PROVIDERS):
+            if DNS_PROVIDER_MATCHER.search(ns.lower()):
                 risk_score += 2
                 warnings.append(f"Suspicious DNS provider: {ns}")
                 break
@@ -201,11 +305,10 @@ def analyze_whois_data(domain, whois_data):
         warnings.append("DNSSEC not properly enabled.")
     
     # Domain extension check
-    for ext in SUSPICIOUS_EXTENSIONS:
-        if domain.endswith(ext):
-            risk_score += 3
-            warnings.append(f"Suspicious domain extension: {ext}")
-            break
+    ext = suspicious_extension(domain)
+    if ext:
+        risk_score += 3
+        warnings.append(f"Suspicious domain extension: {ext}")
     
     return risk_score, warnings
 
@@ -230,11 +333,13 @@ def analyze_url_parts(url):
     path = parsed.path.lower()
     query = parsed.query.lower()
     
-    for keyword in SUSPICIOUS_KEYWORDS:
-        if keyword in path:
+    in_path = KEYWORD_MATCHER.find_all(path)
+    in_query = KEYWORD_MATCHER.find_all(query)
+    for keyword in KEYWORD_MATCHER.ordered(in_path | in_query):
+        if keyword in in_path:
             risk_score += 1
             warnings.append(f"Path contains '{keyword}'")
-        if keyword in query:
+        if keyword in in_query:
             risk_score += 1
             warnings.append(f"Query contains '{keyword}'")
     
@@ -244,26 +349,14 @@ def analyze_url_parts(url):
     
     return risk_score, warnings
 
-def detect_phishing(original_url):
-    """Main phishing detection function"""
-    API_KEY = ""  # Set in config/settings.py
-    original_domain = get_domain(original_url)
-    
-    # Get WHOIS data
-    whois_data = get_whoisxml_data(original_domain, API_KEY)
-    
-    # Perform analyses
-    whois_score, whois_warnings = analyze_whois_data(original_domain, whois_data)
-    sub_score, sub_warnings = analyze_subdomain(original_url)
-    url_parts_score, url_parts_warnings = analyze_url_parts(original_url)
-    
-    # Calculate total risk
-    total_risk = whois_score + sub_score + url_parts_score
-    all_warnings = whois_warnings + sub_warnings + url_parts_warnings
+def _risk_result(domain, findings, final_url):
+    # findings: (score, warnings) of the WHOIS, subdomain and URL-part analyses
+    total_risk = sum(score for score, _ in findings)
+    all_warnings = [warning for _, warnings in findings for warning in warnings]
     
     # Check redirection
-    if final_url := check_redirection(original_url):
-        if get_domain(final_url) != original_domain:
+    if final_url:
+        if get_domain(final_url) != domain:
             total_risk += 4
             all_warnings.append("Suspicious redirection detected")
     
@@ -273,14 +366,83 @@ def detect_phishing(original_url):
     return {
         'risk_score': score,
         'warnings': all_warnings,
-        'domain': original_domain
+        'domain': domain
     }
 
-# For standalone testing
+def detect_phishing(original_url, api_key=WHOISXML_API_KEY):
+    """Main phishing detection function"""
+    original_domain = get_domain(original_url)
+    
+    # Get WHOIS data
+    whois_data = get_whoisxml_data(original_domain, api_key)
+    
+    # Perform analyses
+    findings = [
+        analyze_whois_data(original_domain, whois_data),
+        analyze_subdomain(original_url),
+        analyze_url_parts(original_url),
+    ]
+    return _risk_result(original_domain, findings, check_redirection(original_url))
+
+def detect_phishing_many(urls, workers=PHISHING_CHECK_WORKERS, api_key=WHOISXML_API_KEY):
+    """Score many URLs as detect_phishing does; returns one result per URL, in order.
+
+    WHOIS is fetched and analyzed once per registrable domain and redirects are
+    checked once per distinct URL, all concurrently on at most workers threads.
+    The string analyses of each distinct URL run while those requests are out.
+    """
+    unique = list(dict.fromkeys(urls))
+    extracted = {url: tldextract.extract(url) for url in unique}
+    domains = {url: _registrable_domain(ext) for url, ext in extracted.items()}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='phishing') as pool:
+        whois = {domain: pool.submit(get_whoisxml_data, domain, api_key) for domain in set(domains.values())}
+        redirects = {url: pool.submit(check_redirection, url) for url in unique}
+        local = {url: [analyze_subdomain(url, extracted[url]), analyze_url_parts(url)] for url in unique}
+        whois_findings = {domain: analyze_whois_data(domain, future.result()) for domain, future in whois.items()}
+        final_urls = {url: future.result() for url, future in redirects.items()}
+    return [
+        _risk_result(domains[url], [whois_findings[domains[url]]] + local[url], final_urls[url])
+        for url in urls
+    ]
+
+def read_urls(path):
+    """URLs of a file, one per line; blank lines and # comments are skipped."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Phishing risk of URLs. Without --file, asks for one URL.")
+    parser.add_argument('--file', help='file of URLs, one per line; prints one JSON line per URL')
+    parser.add_argument('-o', '--output', default='-', help='with --file, JSONL file to write (default: stdout)')
+    parser.add_argument('--workers', type=int, default=PHISHING_CHECK_WORKERS,
+                        help='concurrent WHOIS and redirect checks')
+    args = parser.parse_args(argv)
+
+    # For standalone testing
+    if not args.file:
+        url = input("\nEnter URL: ")
+        result = detect_phishing(url)
+        print(f"\nRisk Score: {result['risk_score']}%")
+        print("Warnings:")
+        for warning in result['warnings']:
+            print(f"- {warning}")
+        return 0
+
+    urls = read_urls(args.file)
+    started = time.monotonic()
+    results = detect_phishing_many(urls, args.workers)
+    elapsed = time.monotonic() - started
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for url, result in zip(urls, results):
+            out.write(json.dumps({'url': url, **result}, ensure_ascii=False) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    domains = len({result['domain'] for result in results})
+    rate = len(urls) / elapsed if elapsed else 0.0
+    print(f"Scored {len(urls)} URLs ({domains} domains) in {elapsed:.1f}s: {rate:.0f} URLs/s", file=sys.stderr)
+    return 0
+
 if __name__ == "__main__":
-    url = input("\nEnter URL: ")
-    result = detect_phishing(url)
-    print(f"\nRisk Score: {result['risk_score']}%")
-    print("Warnings:")
-    for warning in result['warnings']:
-        print(f"- {warning}")
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file